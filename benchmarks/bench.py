@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import PRIX, SURFACE, VILLES, Corpus
+from benchmarks.replay import ReplayServer
+from modules.Annonces import Annonces
+from modules.Sites import ADAPTATEURS, adaptateur
+
+
+class ChronoParse:
+    # Cumule le temps passé dans html_to_soup, quel que soit le thread appelant.
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.html_to_soup = Annonces.html_to_soup
+
+    def __enter__(self) -> "ChronoParse":
+        chrono = self
+        original = self.html_to_soup
+
+        def html_to_soup(annonces, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(annonces, *args, **kwargs)
+            finally:
+                chrono.total += time.perf_counter() - start
+
+        Annonces.html_to_soup = html_to_soup
+        return self
+
+    def __exit__(self, *args) -> None:
+        Annonces.html_to_soup = self.html_to_soup
+
+
+def executer(classe) -> dict:
+    annonces = classe(VILLES, PRIX, SURFACE)
+    with ChronoParse() as chrono:
+        start = time.perf_counter()
+        raw_response = annonces.filter_raw_response(annonces.get_raw_response(), {})
+        fetch = time.perf_counter()
+        # Pour les sites HTML le parsing est fait au fil des pages, donc compté dans fetch.
+        formatted_response = asyncio.run(annonces.aformat_raw_response(raw_response))
+        format = time.perf_counter()
+        nouvelles = annonces.extract_new_annonces(formatted_response, {})
+        fin = time.perf_counter()
+    return {
+        "annonces": len(nouvelles),
+        "total": fin - start,
+        "fetch": fetch - start,
+        "format": format - fetch,
+        "extract": fin - format,
+        "parse": chrono.total,
+    }
+
+
+def mesurer(classe, repetitions: int) -> dict:
+    executer(classe)
+    mesures = [executer(classe) for _ in range(repetitions)]
+    resultat = {cle: statistics.median(mesure[cle] for mesure in mesures) for cle in mesures[0]}
+    tracemalloc.start()
+    executer(classe)
+    resultat["memoire"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    resultat["debit"] = resultat["annonces"] / resultat["total"] if resultat["total"] else 0
+    return resultat
+
+
+def comparer(resultats: dict, reference: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for site, resultat in resultats.items():
+        if site not in reference or not reference[site]["debit"]:
+            continue
+        ecart = resultat["debit"] / reference[site]["debit"] - 1
+        if ecart < -tolerance:
+            regressions.append(f"{site} : {ecart:+.0%} annonces/s")
+    return regressions
+
+
+def main(args) -> int:
+    corpus = args.corpus
+    if not corpus or not os.path.isfile(os.path.join(corpus, "manifest.json")):
+        corpus = Corpus(tempfile.mkdtemp(prefix="annonces-corpus-"), args.annonces_par_page).generer()
+    serveur = ReplayServer(corpus).start()
+    Annonces.transport.redirection = serveur.url
+    # Le serveur de rejeu est local : pas de limite de débit par hôte.
+    Annonces.transport.debit = None
+    Annonces.configure_parser(args.parser)
+    if args.processus:
+        Annonces.configure_processus(args.processus)
+
+    print(f"Corpus {corpus}, parser {Annonces.parser}, {args.processus or 'aucun'} processus, {args.repetitions} répétition(s)")
+    print(f'{"site":<15}{"annonces":>9}{"annonces/s":>12}{"total ms":>10}{"fetch ms":>10}{"parse ms":>10}{"format ms":>10}{"mémoire Ko":>12}')
+    resultats = {}
+    for site in args.site or ADAPTATEURS:
+        try:
+            resultat = resultats[site] = mesurer(adaptateur(site), args.repetitions)
+        except Exception as e:
+            print(f"{site:<15}{type(e).__name__}: {e}")
+            continue
+        print(f'{site:<15}{resultat["annonces"]:>9.0f}{resultat["debit"]:>12.0f}{resultat["total"] * 1000:>10.1f}'
+              f'{resultat["fetch"] * 1000:>10.1f}{resultat["parse"] * 1000:>10.1f}{resultat["format"] * 1000:>10.1f}{resultat["memoire"] / 1024:>12.0f}')
+    serveur.shutdown()
+    if Annonces.processus:
+        Annonces.processus.shutdown()
+
+    if args.json:
+        json.dump(resultats, open(args.json, "w"), indent=4)
+    if args.reference:
+        regressions = comparer(resultats, json.load(open(args.reference)), args.tolerance)
+        for regression in regressions:
+            print(f"Régression {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne des adaptateurs sur un corpus rejoué localement.")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "corpus"))
+    parser.add_argument("--annonces-par-page", type=int, default=24)
+    parser.add_argument("--parser", default="html.parser")
+    parser.add_argument("--processus", type=int, default=0, help="parse dans un pool de N processus (0 : threads)")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--site", action="append", choices=list(ADAPTATEURS))
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier")
+    parser.add_argument("--reference", help="résultats JSON d'un run précédent à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,193 @@
+import json
+import os
+import random
+from urllib.parse import urlsplit
+
+import requests
+
+from modules import (CavroisAnnonces, ChoquetAnnonces, CImmoAnnonces, CityaAnnonces, DefranceImmoAnnonces, FaelensAnnonces,
+                     FonciaAnnonces, GLVAnnonces, LedouxAnnonces, LilleImmoAnnonces, NexityAnnonces, OrpiAnnonces,
+                     SeizeAnnonces, SergicAnnonces, VacherandAnnonces)
+
+VILLES = ["Lille", "La Madeleine"]
+PRIX = 850
+SURFACE = 20
+
+DESCRIPTIONS = [
+    "Appartement lumineux proche métro, cuisine équipée, balcon et cave.",
+    "Studio meublé en plein centre, idéal étudiant, parking en option.",
+    "Beau T2 au 3ème étage avec ascenseur, double vitrage, chauffage individuel gaz.",
+    "Grand T3 rénové dans le Vieux-Lille, parquet, moulures et cheminée.",
+    "Colocation possible dans cette maison de ville avec jardin.",
+    "Appartement en rez-de-chaussée sur cour, calme, proche commerces.",
+]
+
+
+def cle(method: str, url: str) -> str:
+    morceaux = urlsplit(requests.Request(method, url).prepare().url)
+    query = f"?{morceaux.query}" if morceaux.query else ""
+    return f"{method} {morceaux.netloc}{morceaux.path}{query}"
+
+
+def page(annonces: str, rng: random.Random) -> str:
+    # Le bruit autour des annonces (menus, pied de page, scripts) pèse autant que sur les vrais sites.
+    menu = "".join(f'<li class="menu-item"><a href="/rubrique-{i}">Rubrique {i}</a></li>' for i in range(rng.randint(150, 300)))
+    pied = "".join(f'<div class="footer-col"><p>Agence {i}</p><p>{rng.choice(DESCRIPTIONS)}</p></div>' for i in range(60))
+    script = "<script>" + "var x=1;" * 2000 + "</script>"
+    return f'<!DOCTYPE html><html><head><title>Annonces</title>{script}</head><body><nav><ul>{menu}</ul></nav><main>{annonces}</main><footer>{pied}</footer></body></html>'
+
+
+class Corpus:
+    def __init__(self, dossier: str, annonces_par_page: int = 24, seed: int = 0) -> None:
+        self.dossier = dossier
+        self.annonces_par_page = annonces_par_page
+        self.rng = random.Random(seed)
+        self.manifest = {}
+        self.compteur = 0
+
+    def ref(self) -> str:
+        self.compteur += 1
+        return f"REF{self.compteur:06d}"
+
+    def description(self) -> str:
+        return self.rng.choice(DESCRIPTIONS)
+
+    def prix(self) -> int:
+        return self.rng.randint(350, PRIX)
+
+    def surface(self) -> int:
+        return self.rng.randint(SURFACE, 80)
+
+    def ajouter(self, method: str, url: str, contenu, content_type: str = "text/html") -> None:
+        if not isinstance(contenu, str):
+            contenu, content_type = json.dumps(contenu), "application/json"
+        fichier = f"{len(self.manifest):04d}.{'json' if content_type == 'application/json' else 'html'}"
+        with open(os.path.join(self.dossier, fichier), "w", encoding="utf-8") as f:
+            f.write(contenu)
+        self.manifest[cle(method, url)] = {"fichier": fichier, "content_type": content_type}
+
+    def generer(self) -> str:
+        os.makedirs(self.dossier, exist_ok=True)
+        for methode in [m for m in dir(self) if m.startswith("site_")]:
+            getattr(self, methode)()
+        with open(os.path.join(self.dossier, "manifest.json"), "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        return self.dossier
+
+    def site_sergic(self) -> None:
+        adapter = SergicAnnonces(VILLES, PRIX, SURFACE)
+        for ville in VILLES:
+            annonces = []
+            for _ in range(self.annonces_par_page):
+                ref = self.ref()
+                link = f"https://www.sergic.com/annonce/{ref.lower()}"
+                annonces.append({"ref": ref, "city": ville, "price": self.prix(), "area": self.surface(), "link": link,
+                                 "lat": 50.63 + self.rng.random() / 50, "lng": 3.06 + self.rng.random() / 50, "disponibility": "immediate"})
+                images = "".join(f'<img src="https://www.sergic.com/img/{ref}-{i}.jpg">' for i in range(4))
+                detail = f'<div class="appt-desc__description-text-paragraph">{self.description()}</div><div class="appt-desc__carousel-container">{images}</div>'
+                self.ajouter("GET", link, page(detail, self.rng))
+            self.ajouter("GET", adapter.query_url(ville), annonces)
+
+    def site_foncia(self) -> None:
+        adapter = FonciaAnnonces(VILLES, PRIX, SURFACE)
+        annonces = [{"description": self.description(), "reference": self.ref(), "loyer": self.prix(),
+                     "localisation": {"locality": {"libelle": self.rng.choice(VILLES)}}, "surface": {"totale": self.surface()},
+                     "canonicalUrl": f"/location/{i}", "datePublication": "2024-04-10", "medias": []}
+                    for i in range(self.annonces_par_page * 3)]
+        self.ajouter("POST", adapter.query_url(), {"annonces": annonces})
+
+    def site_citya(self) -> None:
+        adapter = CityaAnnonces(VILLES, PRIX, SURFACE)
+        for numero in range(1, 4):
+            articles = "".join(f'<li><article><a href="/annonces/location/lille/{self.ref()}">voir</a><h3>Appartement <strong>T2 {self.surface()}m²</strong></h3>'
+                               f'<p class="prix">{self.prix()}€* /mois</p><p class="ville">Lille 59000</p><p class="description-start">{self.description()}</p></article></li>'
+                               for _ in range(self.annonces_par_page))
+            self.ajouter("GET", adapter.query_url(numero), page(f'<ul class="list-biens">{articles}</ul>', self.rng))
+
+    def site_vacherand(self) -> None:
+        adapter = VacherandAnnonces(VILLES, PRIX, SURFACE)
+        total = adapter.per_page * 3
+        for numero in range(1, 4):
+            articles = "".join(f'<article><div class="bien"><img src="/img/{i}.jpg"></div><h3 class="ti18">Appartement 2 pièces {self.surface()}m² Lille</h3>'
+                               f'<span class="prix">{self.prix()} €</span><div class="description">{self.description()}</div>'
+                               f'<a class="detail" href="immobilier/location-appartement-lille/ref-{self.ref()}">Détail</a></article>'
+                               for i in range(adapter.per_page))
+            self.ajouter("POST", adapter.query_url(numero), page(f'<h1 class="ti30">{total} biens</h1><div class="liste_biens">{articles}</div>', self.rng))
+
+    def site_ledoux(self) -> None:
+        adapter = LedouxAnnonces(VILLES, PRIX, SURFACE)
+        for numero in range(1, 4):
+            data = [{"descriptif": self.description(), "type": "appartement", "loc": "location", "ville": "Lille", "cpdep": 59000,
+                     "idhabit": self.compteur + i, "prix": self.prix(), "surface": self.surface()} for i in range(self.annonces_par_page)]
+            self.compteur += self.annonces_par_page
+            self.ajouter("GET", adapter.query_url(numero), {"data": {"resultats": {"last_page": 3, "data": data}}})
+
+    def site_lille_immo(self) -> None:
+        adapter = LilleImmoAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="annonce" id="{self.ref()}"><a class="cursor" href="https://www.lille-immo.fr/produit-{i}">voir</a>'
+                           f'<div class="desc"><h2><strong>Appartement à Lille</strong></h2><p class="price">{self.prix()} €</p><ul><li>Surface {self.surface()}m²</li></ul></div>'
+                           f'<div class="desc_hover_wrap">{self.description()}</div></div>' for i in range(self.annonces_par_page))
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_orpi(self) -> None:
+        adapter = OrpiAnnonces(VILLES, PRIX, SURFACE)
+        items = [{"longAd": self.description(), "reference": self.ref(), "location": self.rng.choice(VILLES), "price": self.prix(),
+                  "surface": self.surface(), "slug": f"appartement-lille-{i}", "images": [], "latitude": 50.63, "longitude": 3.06}
+                 for i in range(self.annonces_par_page * 2)]
+        self.ajouter("GET", adapter.query_url(), {"items": items})
+
+    def site_nexity(self) -> None:
+        adapter = NexityAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="product"><a href="/annonce/location/{self.ref()}">voir</a><div class="product-card-content">'
+                           f'<div class="pricing">{self.prix()} € CC</div><div class="location">Lille 59000</div><div class="details">2 pièces | {self.surface()}m²</div></div></div>'
+                           for _ in range(self.annonces_par_page))
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_glv(self) -> None:
+        adapter = GLVAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="item-card"><a href="#">photo</a><a href="../annonce/{i}">voir</a><div class="products-description">{self.description()}</div>'
+                           f'<div class="products-ref">Réf : {self.ref()}</div><div class="price-bold">{self.prix()} €</div><div class="products-city">Lille</div></div>'
+                           for i in range(self.annonces_par_page))
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_cavrois(self) -> None:
+        adapter = CavroisAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="item-product"><a href="#">photo</a><a href="../annonce/{i}">voir</a><div class="products-desc">{self.description()}</div>'
+                           f'<div class="products-ref">Réf : {self.ref()}</div><div class="products-price">Loyer {self.prix()}\xa0\x80 CC</div></div>'
+                           for i in range(self.annonces_par_page))
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_defrance(self) -> None:
+        adapter = DefranceImmoAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="bien"><a href="bien-{i}.html">voir</a><span class="ref">Réf : {self.ref()}</span><span class="big">{self.prix()}€</span></div>'
+                           for i in range(self.annonces_par_page))
+        self.ajouter("POST", adapter.query_url(), page(annonces, self.rng))
+
+    def site_seize(self) -> None:
+        adapter = SeizeAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="link-product"><a href="#">photo</a><a href="../annonce/{i}">voir</a><div class="product-price">Loyer {self.prix()} € /mois</div>'
+                           f'<div class="product-name">Appartement, Lille</div><div class="data-list__item--Surface"><span class="data-list__item--value">{self.surface()} m²</span></div>'
+                           f'<div class="data-list__item--products_model"><span class="data-list__item--value">{self.ref()}</span></div></div>'
+                           for i in range(self.annonces_par_page))
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_faelens(self) -> None:
+        adapter = FaelensAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="item"><a href="bien-{i}.html">voir</a><div class="ref">Réf {self.ref()}</div><div class="prix"><span class="bold">{self.prix()} €</span></div>'
+                           f'<div class="type"><span class="semibold">Lille</span></div></div>' for i in range(self.annonces_par_page))
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_cimmo(self) -> None:
+        adapter = CImmoAnnonces(VILLES, PRIX, SURFACE)
+        annonces = "".join(f'<div class="masonry-item"><a href="appartement-a.louer-lille-{self.prix()}E-ref{self.compteur + i}.html">voir</a>'
+                           f'<div class="overlay-content">{self.description()}</div></div>' for i in range(self.annonces_par_page))
+        self.compteur += self.annonces_par_page
+        self.ajouter("GET", adapter.query_url(), page(annonces, self.rng))
+
+    def site_choquet(self) -> None:
+        adapter = ChoquetAnnonces(VILLES, PRIX, SURFACE)
+        for numero in range(4):
+            annonces = "".join(f'<div class="product-thumb" onclick="location.href=\'bien.php?id={self.compteur + i}\'"><div class="product-title">{self.rng.choice(VILLES + ["Roubaix"])}</div>'
+                               f'<div class="product-desciption">{self.description()}</div><div class="product-category">Réf : {self.ref()}</div>'
+                               f'<div class="product-price">{self.prix() - 60} € + 50 € de charges</div></div>' for i in range(self.annonces_par_page))
+            self.ajouter("GET", adapter.query_url(numero * self.annonces_par_page), page(annonces, self.rng))
@@ -0,0 +1,49 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chaque scénario tourne dans un interpréteur neuf : seul compte ce qui est importé à froid.
+SCENARIOS = {
+    "stockage": "import modules.Stockage",
+    "registre": "import modules.Sites",
+    "site JSON": "from modules.Sites import adaptateur; adaptateur('SERGIC')",
+    "site HTML": "from modules.Sites import adaptateur; adaptateur('CITYA')([], 0, 0).html_to_soup('<p></p>')",
+    "tous les sites": "from modules.Sites import selectionner; selectionner()",
+    "main": "import main",
+}
+
+MESURE = """
+import sys, time
+debut = time.perf_counter()
+{code}
+duree = time.perf_counter() - debut
+print(duree, len(sys.modules), int("bs4" in sys.modules), int("requests" in sys.modules))
+"""
+
+
+def mesurer(code: str) -> tuple[float, int, bool, bool]:
+    sortie = subprocess.run([sys.executable, "-c", MESURE.format(code=code)], cwd=RACINE, capture_output=True, text=True, check=True)
+    duree, modules, bs4, requests = sortie.stdout.split()
+    return float(duree), int(modules), bool(int(bs4)), bool(int(requests))
+
+
+def main(args) -> int:
+    print(f'{"scénario":<16}{"médiane ms":>12}{"min ms":>10}{"modules":>9}{"bs4":>6}{"requests":>10}')
+    for nom in args.scenario or SCENARIOS:
+        mesures = [mesurer(SCENARIOS[nom]) for _ in range(args.repetitions)]
+        durees = [mesure[0] for mesure in mesures]
+        _, modules, bs4, requests = mesures[-1]
+        print(f'{nom:<16}{statistics.median(durees) * 1000:>12.1f}{min(durees) * 1000:>10.1f}{modules:>9}'
+              f'{"oui" if bs4 else "non":>6}{"oui" if requests else "non":>10}')
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Temps d'import à froid des modules et des adaptateurs.")
+    parser.add_argument("--repetitions", type=int, default=7)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from urllib.parse import urlencode
+
+from modules.Geo import localiser
+from modules.Recherche import IndexAnnonces, ServeurRecherche
+
+VILLES = ["Lille", "La Madeleine", "Lambersart", "Marcq-en-Barœul", "Roubaix", "Tourcoing", "Villeneuve-d'Ascq", "Croix"]
+SITES = ["SERGIC", "FONCIA", "CITYA", "VACHERAND", "LEDOUX", "ORPI", "NEXITY", "CHOQUET"]
+
+
+def generer(nombre: int, rng: random.Random) -> IndexAnnonces:
+    index = IndexAnnonces()
+    maintenant = time.time()
+    for i in range(nombre):
+        ville = rng.choice(VILLES)
+        # Une annonce sur trois a une position exacte, les autres se rabattent sur leur commune.
+        lat, lon = localiser(ville)
+        coordonnees = (lat + rng.uniform(-0.01, 0.01), lon + rng.uniform(-0.015, 0.015)) if rng.random() < 0.33 else None
+        index.ajouter(rng.choice(SITES), f"REF{i}", {
+            "ville": ville,
+            "coordonnees": coordonnees,
+            "prix": rng.randrange(300, 1500) if rng.random() > 0.05 else None,
+            "surface": rng.randrange(9, 90) if rng.random() > 0.2 else None,
+            "url": f"https://example.org/annonce/{i}",
+            "description": "",
+        }, maintenant - rng.random() * 365 * 24 * 3600)
+    return index
+
+
+def requetes(nombre: int, rng: random.Random) -> list[dict]:
+    liste = []
+    for _ in range(nombre):
+        requete = {}
+        if rng.random() < 0.7:
+            requete["prix_max"] = rng.randrange(400, 1500)
+        if rng.random() < 0.3:
+            requete["prix_min"] = rng.randrange(300, 700)
+        if rng.random() < 0.5:
+            requete["surface_min"] = rng.randrange(9, 60)
+        if rng.random() < 0.5:
+            requete["ville"] = rng.choice(VILLES)
+        if rng.random() < 0.2:
+            requete["site"] = rng.choice(SITES)
+        requete["tri"] = rng.choice(["-detection", "prix", "-surface"])
+        tirage = rng.random()
+        if tirage < 0.2:
+            requete["lat"], requete["lon"] = 50.63 + rng.uniform(-0.05, 0.05), 3.06 + rng.uniform(-0.08, 0.08)
+            requete["rayon_km"] = rng.choice([0.5, 1, 2, 5])
+            if rng.random() < 0.5:
+                requete["tri"] = "distance"
+        elif tirage < 0.3:
+            sud, ouest = 50.60 + rng.uniform(0, 0.08), 3.00 + rng.uniform(0, 0.15)
+            requete["bbox"] = f"{sud},{ouest},{sud + 0.03},{ouest + 0.05}"
+        requete["page"] = rng.randrange(1, 4)
+        liste.append(requete)
+    return liste
+
+
+def centiles(durees: list[float]) -> dict:
+    quantiles = statistics.quantiles(durees, n=100)
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98], "max": max(durees)}
+
+
+async def mesurer_http(serveur: ServeurRecherche, liste: list[dict]) -> list[float]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", serveur.port)
+    durees = []
+    for requete in liste:
+        debut = time.perf_counter()
+        writer.write(f"GET /annonces?{urlencode(requete)} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        taille = 0
+        while (ligne := await reader.readline()) != b"\r\n":
+            if ligne.lower().startswith(b"content-length:"):
+                taille = int(ligne.split(b":")[1])
+        await reader.readexactly(taille)
+        durees.append(time.perf_counter() - debut)
+    writer.close()
+    await writer.wait_closed()
+    await asyncio.sleep(0)
+    return durees
+
+
+async def main(args) -> int:
+    rng = random.Random(0)
+    debut = time.perf_counter()
+    index = generer(args.annonces, rng)
+    print(f"Index de {len(index)} annonces construit en {time.perf_counter() - debut:.2f}s")
+    liste = requetes(args.requetes, rng)
+
+    durees = []
+    for requete in liste:
+        parametres = ServeurRecherche(index).parametres(urlencode(requete))
+        debut = time.perf_counter()
+        index.requete(**parametres)
+        durees.append(time.perf_counter() - debut)
+    serveur = await ServeurRecherche(index).demarrer(port=0)
+    durees_http = await mesurer_http(serveur, liste)
+    serveur.fermer()
+
+    print(f'{"":<8}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+    for nom, mesures in (("index", durees), ("http", durees_http)):
+        resultat = centiles(mesures)
+        print(f'{nom:<8}' + "".join(f'{resultat[cle] * 1000:>10.2f}' for cle in ("p50", "p95", "p99", "max")))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latence de l'API de recherche sur un index synthétique.")
+    parser.add_argument("--annonces", type=int, default=20000)
+    parser.add_argument("--requetes", type=int, default=2000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
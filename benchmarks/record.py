@@ -0,0 +1,40 @@
+import argparse
+import json
+import os
+
+from benchmarks.corpus import PRIX, SURFACE, VILLES, cle
+from modules.Annonces import Annonces
+from modules.Sites import ADAPTATEURS, adaptateur
+
+
+def enregistrer(dossier: str, sites: list[str]) -> None:
+    os.makedirs(dossier, exist_ok=True)
+    manifest_file = os.path.join(dossier, "manifest.json")
+    manifest = json.load(open(manifest_file)) if os.path.isfile(manifest_file) else {}
+
+    def observateur(response) -> None:
+        if response.status_code != 200:
+            return
+        content_type = response.headers.get("Content-Type", "text/html").split(";")[0]
+        fichier = f"{len(manifest):04d}.{'json' if content_type == 'application/json' else 'html'}"
+        with open(os.path.join(dossier, fichier), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        manifest[cle(response.request.method, response.request.url)] = {"fichier": fichier, "content_type": content_type}
+
+    Annonces.transport.observateurs.append(observateur)
+    for site in sites:
+        try:
+            adaptateur(site)(VILLES, PRIX, SURFACE).get_new_annonces({})
+            print(f"{site} : OK")
+        except Exception as e:
+            print(f"{site} : {e}")
+    with open(manifest_file, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enregistre les réponses des sites réels dans un corpus rejouable.")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "corpus"))
+    parser.add_argument("--site", action="append", choices=list(ADAPTATEURS))
+    args = parser.parse_args()
+    enregistrer(args.corpus, args.site or list(ADAPTATEURS))
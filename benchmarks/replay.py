@@ -0,0 +1,47 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def repondre(self) -> None:
+        longueur = int(self.headers.get("Content-Length", 0))
+        if longueur:
+            self.rfile.read(longueur)
+        entree = self.server.manifest.get(f"{self.command} {self.path[1:]}")
+        if entree is None:
+            corps, content_type, statut = b"", "text/html", 404
+        else:
+            corps = open(os.path.join(self.server.dossier, entree["fichier"]), "rb").read()
+            content_type, statut = entree["content_type"], 200
+        self.send_response(statut)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    do_GET = repondre
+    do_POST = repondre
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, dossier: str, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), ReplayHandler)
+        self.dossier = dossier
+        self.manifest = json.load(open(os.path.join(dossier, "manifest.json")))
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
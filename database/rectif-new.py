@@ -1,15 +1,14 @@
-import json
-import datetime
+import os
+import sys
+import time
 
-db = json.load(open('database/db.json'))
-new = []
-curr_date = datetime.datetime.now()
-for agence, annonces in db.items():
-    for ref, annonce in annonces.items():
-        if not 'detection' in annonce:
-            continue
-        date =  datetime.datetime.strptime(annonce['detection'], "%d/%m/%Y %H:%M:%S")
-        if curr_date-date < datetime.timedelta(days=3):
-            new.append(annonce)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.Fenetre import JOUR, FenetreNouveautes
+from modules.Stockage import ouvrir
+
+stockage = ouvrir('database/annonces.sqlite', 'database/db.json')
+fenetre = FenetreNouveautes(duree=3 * JOUR)
+for horodatage, annonce in stockage.recentes(time.time() - fenetre.duree):
+    fenetre.ajouter(annonce, horodatage)
             
-json.dump(new, open('database/new.json', 'w'), indent=4)
\ No newline at end of file
+fenetre.sauver('database/new.json')
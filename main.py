@@ -1,9 +1,28 @@
-from modules import *
-import json
+from modules.Annonces import Annonces
+from modules.Stockage import ouvrir
+from modules.Fenetre import JOUR
+from modules.Doublons import Dedoublonneur
+from modules.Planificateur import Planificateur, Rythme
+from modules.Disjoncteur import Disjoncteurs
+from modules.Metriques import metriques
+from modules.Profilage import Profileur
+from modules.Publication import Publieur
+from modules.Profils import Profils
+from modules.Recherche import IndexAnnonces, ServeurRecherche
+from modules.Sites import ADAPTATEURS, selectionner
+from modules.Notifications import NOTIFICATIONS, notificateur, par_defaut
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
 import os
-import threading
-import time, datetime
-import winsound
+import time
+
+DATABASE_DIR = os.path.join(os.path.dirname(__file__), 'database')
+RECHERCHES_FILE = os.path.join(os.path.dirname(__file__), 'recherches.json')
+METRIQUES_FILE = os.path.join(os.path.dirname(__file__), 'database', 'metriques.json')
+DISJONCTEURS_FILE = os.path.join(os.path.dirname(__file__), 'database', 'disjoncteurs.json')
+# Remplacée au démarrage par le backend choisi (--notification).
+notifier = notificateur('aucune')
 
 def printTab(str, n = 1)->None:
     print('\t'*n, str)
@@ -11,110 +30,211 @@ def printTab(str, n = 1)->None:
 def printDash(n=20)->None:
     print('-'*n)
 
-def update_annonces(site, villes, prix, surface, classe, db, nouvelles_annonces):
+def configure_executor()->None:
+    # requests étant bloquant, les appels HTTP passent par un pool de threads borné
+    # tandis que l'orchestration de tous les sites tient dans une seule boucle.
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=32))
+
+async def update_annonces(site, villes, prix, surface, classe, stockage, nouveautes_par_site):
     try:
         start = time.time()
-        historique = db[site] if site in db else {}
-        nouveautes = classe(villes, prix, surface).get_new_annonces(historique)
-        nouvelles_annonces += [annonce for annonce in nouveautes.values()]
+        historique = stockage.references(site)
+        annonces = classe(villes, prix, surface)
+        annonces.libelle = site
+        nouveautes = await annonces.aget_new_annonces(historique)
         for annonce in nouveautes.values():
-            annonce["detection"]= datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        historique.update(nouveautes)    
-        db[site]=historique
-        printTab(f'{site} : OK, {len(nouveautes)} nv., {time.time()-start:.2f}s')
+            annonce.horodatage = time.time()
+        nouveautes_par_site[site] = nouveautes
+        cache = annonces.cache.stats.get(annonces.site) if annonces.cache_http else None
+        cache = f' (cache : {cache["hit"]} hit, {cache["miss"]} miss, {cache["revalide"]} revalidé)' if cache else ''
+        printTab(f'{site} : OK, {len(nouveautes)} nv., {time.time()-start:.2f}s{cache}')
+        return True
     except Exception as e:
+        metriques.incrementer("annonces_erreurs_total", site=site, type=type(e).__name__)
         printTab(f'{site} : {str(e)}')
-    
-def clear_old_new(new):
-    l = len(new)
-    new_new = []
-    curr_date = datetime.datetime.now()
-    for annonce in new :
-        date = datetime.datetime.strptime(annonce['detection'], "%d/%m/%Y %H:%M:%S")
-        if curr_date-date < datetime.timedelta(days=7):
-            new_new.append(annonce)
-        
-    nl = len(new_new)
-    if nl < l:
-        printTab(f'Nettoyage de {l-nl} anciennes annonces.')
-    return new_new
-
-def main(villes, prix, surface, sites):
-    printDash()
-    db_file = os.path.join(os.path.dirname(__file__), 'database', 'db.json')
-    new_file = os.path.join(os.path.dirname(__file__), 'database', 'new.json')
-    db = json.load(open(db_file)) if os.path.isfile(db_file) else {}
-    new = json.load(open(new_file)) if os.path.isfile(new_file) else {}
-    new = clear_old_new(new)
-    new_annonces = []   
-
-    threads = [threading.Thread(target=update_annonces, args=(site, villes, prix, surface, classe, db, new_annonces)) for site, classe in sites.items()]
-    
-    [thread.start() for thread in threads]
-    [thread.join() for thread in threads]
-        
+        return False
+
+async def update_sites(villes, prix, surface, sites, stockage, nouveautes_par_site):
+    configure_executor()
+    await asyncio.gather(*(update_annonces(site, villes, prix, surface, classe, stockage, nouveautes_par_site) for site, classe in sites.items()))
+
+def clear_old_new(profil):
+    expirees = profil.fenetre.expirer()
+    if expirees:
+        printTab(f'{profil.nom} : nettoyage de {len(expirees)} anciennes annonces.')
+
+def enregistrer(nouveautes_par_site, sites, stockage, profils, dedoublonneur, index=None):
+    # Une seule alerte par groupe d'annonces identiques entre agences, puis répartition par profil
+    # selon les villes que chaque site a réellement interrogées.
+    new_annonces = []
+    repartition = {profil: [] for profil in profils}
+    villes = profils.criteres()[0]
+    for site, nouveautes in nouveautes_par_site.items():
+        with metriques.chrono(site, "dedup"):
+            nouvelles = [annonce for annonce in nouveautes.values() if dedoublonneur.ajouter(site, annonce)]
+        new_annonces += nouvelles
+        for profil, annonces in profils.repartir(nouvelles, sites[site].couverture(villes)).items():
+            repartition[profil] += annonces
+        with metriques.chrono(site, "persist"):
+            stockage.ajouter({site: nouveautes})
+            if index is not None:
+                for reference, annonce in nouveautes.items():
+                    index.ajouter(site, reference, annonce.valeurs(), annonce.horodatage)
+    for profil, annonces in repartition.items():
+        for annonce in annonces:
+            profil.fenetre.ajouter(annonce.valeurs(), annonce.horodatage)
+    return new_annonces, repartition
+
+def alerter(new_annonces, doublons, repartition):
     total = len(new_annonces)
+    print(f'Nombre total de nouvelles annonces : {total}' + (f' ({doublons} doublons ignorés)' if doublons else ''))
+    for profil, annonces in repartition.items():
+        if len(repartition) > 1 and annonces:
+            printTab(f'{profil.nom} : {len(annonces)}')
+        [printTab(f'{annonce.prix}€ {annonce.surface}m² {annonce.url}', 2 if len(repartition) > 1 else 1) for annonce in annonces]
+
+    notifier(total)
+
+def publier(profil, publieur):
+    # Seules les données du tableau de bord sont publiées, et seulement si elles ont changé :
+    # new.json (minifié) pour le premier affichage, le flux de différences pour les suivants.
+    clear_old_new(profil)
+    if not publieur.soumettre(profil.new_file, profil.fenetre.contenu()):
+        return
+    ecrits, supprimes = profil.flux.mettre_a_jour(profil.fenetre.liste())
+    for fichier, donnees in ecrits:
+        publieur.soumettre(fichier, donnees)
+    for fichier in supprimes:
+        publieur.retirer(fichier)
+    printTab(f'{profil.nom} : publication de {len(profil.fenetre)} nouvelles annonces programmée (flux n°{profil.flux.sequence}).')
+
+def main(profils, sites, stockage, dedoublonneur, publieur=None):
     printDash()
-    print(f'Nombre total de nouvelles annonces : {total}')
-    [print('\t', f'{annonce["prix"]}€', f'{annonce["surface"]}m²', annonce['url']) for annonce in new_annonces]
-    
-    [winsound.Beep(300, 250) for i in range(total if total <= 5 else 5)]      
-    
-    new += new_annonces  
-    
-    json.dump(new, open(new_file, "w"), indent=4)
-    json.dump(db, open(db_file, "w"), indent=4)
-    os.system("git add *")
-    os.system("git commit -m \"Mise à jour des nouvelles annonces\"")
-    os.system("git push")
-    
+    nouveautes_par_site = {}
+
+    asyncio.run(update_sites(*profils.criteres(), sites, stockage, nouveautes_par_site))
+    new_annonces, repartition = enregistrer(nouveautes_par_site, sites, stockage, profils, dedoublonneur)
+
+    printDash()
+    alerter(new_annonces, sum(len(nouveautes) for nouveautes in nouveautes_par_site.values()) - len(new_annonces), repartition)
+    stats = Annonces.transport.stats().values()
+    print(f'Connexions HTTP : {sum(s["connexions"] for s in stats)} ouvertes, {sum(s["reutilisations"] for s in stats)} réutilisées')
+
+    metriques.sauver(METRIQUES_FILE)
+    if publieur:
+        for profil in profils:
+            publier(profil, publieur)
+        publieur.vider()
+
+def profiler(boucles, par_site, profils, sites, stockage, dedoublonneur, publieur):
+    # Boucles complètes profilées d'un bloc ou site par site. Les nouveautés enregistrées ne seront
+    # plus nouvelles au prochain lancement : elles sont publiées à la fin, hors des mesures.
+    profileur = Profileur(os.path.join(os.path.dirname(__file__), 'database', 'profils'))
+    for boucle in range(1, boucles + 1):
+        if not par_site:
+            with profileur.session(f'boucle{boucle}', list(sites.values())):
+                main(profils, sites, stockage, dedoublonneur)
+            continue
+        for site, classe in sites.items():
+            with profileur.session(f'boucle{boucle}-{site}', [classe]):
+                main(profils, {site: classe}, stockage, dedoublonneur)
+    for profil in profils:
+        publier(profil, publieur)
+    publieur.vider()
+
+async def planifier(profils, sites, stockage, dedoublonneur, planificateur, publieur, index, periode_nettoyage=15*60):
+    configure_executor()
+    # Une seule requête par site quel que soit le nombre de profils : les critères les plus larges.
+    villes, prix, surface = profils.criteres()
+
+    async def passage(site):
+        nouveautes_par_site = {}
+        if not await update_annonces(site, villes, prix, surface, sites[site], stockage, nouveautes_par_site):
+            metriques.sauver(METRIQUES_FILE)
+            return None
+        new_annonces, repartition = enregistrer(nouveautes_par_site, sites, stockage, profils, dedoublonneur, index)
+        if new_annonces:
+            alerter(new_annonces, len(nouveautes_par_site[site]) - len(new_annonces), repartition)
+            for profil, annonces in repartition.items():
+                if annonces:
+                    publier(profil, publieur)
+        metriques.sauver(METRIQUES_FILE)
+        return len(nouveautes_par_site[site])
+
+    async def nettoyage():
+        # Les annonces expirées doivent aussi disparaître du tableau de bord sans nouveauté.
+        while True:
+            await asyncio.sleep(periode_nettoyage)
+            for profil in profils:
+                publier(profil, publieur)
+
+    nettoyages = asyncio.create_task(nettoyage())
+    # API de recherche sur l'historique : http://127.0.0.1:8765/annonces?prix_max=800&ville=Lille
+    # et http://127.0.0.1:8765/texte?q=balcon+parking&prix_max=800
+    serveur = await ServeurRecherche(index, stockage).demarrer()
+    print(f'API de recherche sur http://127.0.0.1:{serveur.port}/annonces ({len(index)} annonces indexées)')
+    await planificateur.executer(passage)
+
 
 import atexit
 
 
 if __name__ == "__main__":
-    villes = ["Lille", "La Madeleine"]
-    surface=20
-    prix=850    
-    sites : dict[str, Annonces]= {
-        "SERGIC": SergicAnnonces,
-        "FONCIA": FonciaAnnonces,
-        "CITYA": CityaAnnonces,
-        "VACHERAND": VacherandAnnonces,
-        "LEDOUX": LedouxAnnonces,   
-        "LILLE IMMO": LilleImmoAnnonces,    
-        "ORPI": OrpiAnnonces,
-        "NEXITY": NexityAnnonces,
-        "GLV": GLVAnnonces,
-        "CAVROIS": CavroisAnnonces,
-        "DEFRANCE IMMO": DefranceImmoAnnonces,
-        "SEIZE": SeizeAnnonces,
-        "FAELENS": FaelensAnnonces,
-        "C IMMO": CImmoAnnonces,
-        "CHOQUET": ChoquetAnnonces,
+    arguments = argparse.ArgumentParser(description="Surveille les annonces de location des agences.",
+                                        # --profil (cProfile) ne doit pas s'abréger à partir d'une autre option.
+                                        allow_abbrev=False)
+    arguments.add_argument("--profil", type=int, default=int(os.environ.get("ANNONCES_PROFIL", 0)), metavar="N",
+                           help="profile N boucles puis s'arrête (ou variable ANNONCES_PROFIL=N), résultats dans database/profils")
+    arguments.add_argument("--profil-par-site", action="store_true", default=bool(os.environ.get("ANNONCES_PROFIL_PAR_SITE")),
+                           help="un profil par site plutôt qu'un par boucle")
+    arguments.add_argument("--site", "--only", action="append", dest="sites", metavar="SITE",
+                           help=f"n'interroge que ce site, option répétable ({', '.join(ADAPTATEURS)})")
+    arguments.add_argument("--sauf", action="append", metavar="SITE", help="désactive ce site, option répétable")
+    arguments.add_argument("--notification", choices=list(NOTIFICATIONS), default=os.environ.get("ANNONCES_NOTIFICATION", par_defaut()),
+                           help="alerte à l'arrivée de nouvelles annonces (ou variable ANNONCES_NOTIFICATION)")
+    arguments.add_argument("--recherches", default=RECHERCHES_FILE, metavar="FICHIER",
+                           help="recherches nommées (villes, prix, surface), voir recherches.json")
+    args = arguments.parse_args()
+    try:
+        # Seuls les modules des adaptateurs retenus sont importés, main.py ne charge que la classe de base.
+        sites : dict[str, Annonces] = selectionner(args.sites, args.sauf)
+    except ValueError as e:
+        arguments.error(str(e))
+    notifier = notificateur(args.notification)
+
+    profils = Profils.charger(args.recherches, DATABASE_DIR)
+    jours_nouveautes = 7
+    Annonces.configure_parser("lxml")
+    # Le parsing HTML tourne dans un processus par cœur, le réseau reste dans la boucle asyncio.
+    # En profilage il reste dans le processus courant pour apparaître dans les mesures.
+    if not args.profil:
+        Annonces.configure_processus()
+    # Bornes d'intervalle (secondes) par site, les autres gardent celles par défaut.
+    rythmes = {
+        "FONCIA": Rythme(minimum=2*60),
+        "ORPI": Rythme(minimum=2*60),
+        "CHOQUET": Rythme(minimum=15*60, maximum=2*3600),
         }
-    loop = 0
+    # Sites en échec répété coupés puis testés à nouveau, état conservé entre deux lancements.
+    planificateur = Planificateur({site: rythmes.get(site, Rythme()) for site in sites}, Disjoncteurs(DISJONCTEURS_FILE))
+    stockage = ouvrir(os.path.join(os.path.dirname(__file__), 'database', 'annonces.sqlite'),
+                      os.path.join(os.path.dirname(__file__), 'database', 'db.json'))
+    profils.charger_fenetres(jours_nouveautes * JOUR)
+    dedoublonneur = Dedoublonneur(fenetre=jours_nouveautes * JOUR)
+    dedoublonneur.charger(stockage)
+    if args.profil:
+        profiler(args.profil, args.profil_par_site, profils, sites, stockage, dedoublonneur,
+                 Publieur(os.path.dirname(os.path.abspath(__file__))))
+        raise SystemExit
+    # Métriques Prometheus sur http://127.0.0.1:9464/metrics
+    metriques.servir()
+    # Les commits partent d'un thread, regroupés par fenêtres de 60 s ; la sortie publie le reliquat.
+    publieur = Publieur(os.path.dirname(os.path.abspath(__file__))).demarrer()
+    atexit.register(publieur.arreter)
     start = time.time()
-    atexit.register(lambda: print(f'Fin du programme ({loop-1} boucle(s), {time.time()-start:.2f}s)'))
-    
-    print(f'Récupération des annonces depuis {len(sites)} sites :')
+    atexit.register(lambda: print(f'Fin du programme ({time.time()-start:.2f}s)'))
+
+    print(f'Récupération des annonces depuis {len(sites)} sites pour {len(profils)} recherche(s) :')
+    [print('\t', profil) for profil in profils]
     [print('\t', site) for site in sites.keys()]
-    while True:
-        loop += 1
-        print(f'[{time.strftime("%d/%m/%Y %H:%M:%S")}] Boucle {loop}')
-        t1 = time.time()
-        main(villes, prix, surface, sites)
-        t = time.time()-t1
-        delta = 60*15-t
-        next = datetime.datetime.now() + datetime.timedelta(seconds=delta)
-        print(f'[{time.strftime("%d/%m/%Y %H:%M:%S")}] Fin de la boucle {loop} ({t:.2f}s).')
-        print(f'[{time.strftime("%d/%m/%Y %H:%M:%S")}] Prochaine boucle à {next.strftime("%H:%M:%S")} ...')
-        time.sleep(delta)
-        
-    
-    
-    
-
-    
-    
-    
\ No newline at end of file
+    asyncio.run(planifier(profils, sites, stockage, dedoublonneur, planificateur, publieur, IndexAnnonces.charger(stockage)))
@@ -1,27 +1,50 @@
+import sys
+
+
+def nombre(valeur) -> float:
+    if valeur is None or isinstance(valeur, (int, float)):
+        return valeur
+    texte = str(valeur).replace("\xa0", "").replace(" ", "").replace(",", ".")
+    try:
+        valeur = float(texte)
+    except ValueError:
+        return None
+    return int(valeur) if valeur.is_integer() else valeur
+
+
 class Annonce:
-    def __init__(self, reference: str, ville: str, prix: int, surface: int, url: str, description: str, images: list[str], coordonnees: tuple[float, float] = None, disponibilite: str = None, publication: str = None) -> None:
-        self.reference = reference
-        self.ville = ville
-        self.prix = prix
-        self.surface = surface
+    __slots__ = ("reference", "ville", "prix", "surface", "url", "description", "images",
+                 "coordonnees", "disponibilite", "publication", "horodatage", "groupe", "signature")
+
+    def __init__(self, reference: str, ville: str, prix: int, surface: int, url: str, description: str, images: list[str], coordonnees: tuple[float, float] = None, disponibilite: str = None, publication: str = None, horodatage: float = None) -> None:
+        self.reference = str(reference)
+        self.ville = sys.intern(ville) if ville else ville
+        self.prix = nombre(prix)
+        self.surface = nombre(surface)
         self.url = url
         self.description = description
         self.images = images
-        self.coordonnees = coordonnees
+        self.coordonnees = tuple(coordonnees) if coordonnees else coordonnees
         self.disponibilite = disponibilite
         self.publication = publication
-        
+        self.horodatage = horodatage
+        self.groupe = None
+        self.signature = None
+
+    def valeurs(self) -> dict:
+        return {
+            "ville": self.ville,
+            "prix": self.prix,
+            "surface": self.surface,
+            "url": self.url,
+            "description": self.description,
+            "images": self.images,
+            "coordonnees": self.coordonnees,
+            "disponibilite": self.disponibilite,
+            "publication": self.publication
+        }
+
     def dict(self) -> dict:
         return {
-            self.reference : {
-                "ville": self.ville,
-                "prix": self.prix,
-                "surface": self.surface,
-                "url": self.url,
-                "description": self.description,
-                "images": self.images,
-                "coordonnees": self.coordonnees,
-                "disponibilite": self.disponibilite,
-                "publication": self.publication
-            }
-        }
\ No newline at end of file
+            self.reference : self.valeurs()
+        }
@@ -1,20 +1,106 @@
 from abc import ABC, abstractmethod
 from modules.Annonce import Annonce
+from modules.Limiteur import LimiteurHotes
+from modules.Transport import transport
+from modules.Cache import ReponseCachee, cache
+from modules.Filtre import FiltreRedibitoire
+from modules.Metriques import metriques
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import hashlib
+import inspect
+import sys
+import time
 import requests
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+# bs4 n'est importé qu'au premier parsing HTML : les sites JSON démarrent sans lui.
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+
+@lru_cache(maxsize=None)
+def strainer(classes: tuple) -> "SoupStrainer":
+    # Pendant le parsing l'attribut class n'est pas encore découpé : on compare les jetons.
+    from bs4 import SoupStrainer
+    return SoupStrainer(class_=lambda valeur: valeur is not None and not set(classes).isdisjoint(valeur.split()))
+
+
+@lru_cache(maxsize=None)
+def version_extraction(classe: type) -> str:
+    # Empreinte des modules de l'adaptateur et de ses bases (spec, extracteurs, Annonce) : modifier
+    # le code d'extraction invalide les résultats formatés en cache, même si la page ne change pas.
+    modules = dict.fromkeys(base.__module__ for base in classe.__mro__ if base.__module__.startswith("modules."))
+    sources = [inspect.getsource(sys.modules[module]) for module in [*modules, "modules.Annonce"]]
+    return hashlib.sha1("".join(sources).encode()).hexdigest()
+
+
+def initialiser_processus(parser: str, redibitoires: list[str]) -> None:
+    # Les processus lancés en "spawn" ne voient pas la configuration faite dans le parent.
+    Annonces.parser = parser
+    Annonces.configurer_redibitoires(redibitoires)
 
 
 class Annonces(ABC):
-    redibitoires = ["colocation", "coloc",
-                    "co-location", "rez-de-chaussée", " rdc "]
+    # Voir FiltreRedibitoire : "*" garde les formes dérivées que l'ancienne recherche de sous-chaîne écartait.
+    redibitoires = ["coloc*", "co-loc*", "rez-de-chaussée*", "rdc"]
+    filtre = FiltreRedibitoire(redibitoires)
 
     slugs = {}
+    # Villes codées en dur dans la requête du site, quelles que soient celles demandées.
+    villes_interrogees: list[str] = None
+
+    parser = "html.parser"
+    selecteur_annonces: str = None
+    conteneur: tuple = None
+
+    connexions_par_hote = 4
+    limiteur = LimiteurHotes()
+    transport = transport
+
+    cache_http = False
+    cache = cache
+
+    processus: ProcessPoolExecutor = None
+    metriques = metriques
+
+    # Résultats triés du plus récent au plus ancien : la pagination s'arrête à la première page déjà connue.
+    tri_recent = False
 
     def __init__(self, site: str, villes: list[str], prix: int, surface: int) -> None:
         self.site = site
         self.villes = villes
         self.prix = prix
         self.surface = surface
+        self.filtrees = 0
+        # Étiquette des métriques, main.py la remplace par sa clé de site.
+        self.libelle = site
+
+    @classmethod
+    def configure_parser(cls, parser: str) -> None:
+        if parser == "lxml":
+            try:
+                import lxml
+            except ImportError:
+                print("lxml n'est pas installé, utilisation de html.parser")
+                parser = "html.parser"
+        Annonces.parser = parser
+
+    @classmethod
+    def configure_processus(cls, workers: int = None) -> None:
+        # À appeler après configure_parser / configurer_redibitoires, transmis aux processus à leur création.
+        Annonces.processus = ProcessPoolExecutor(max_workers=workers, initializer=initialiser_processus,
+                                                 initargs=(Annonces.parser, Annonces.redibitoires))
+
+    @classmethod
+    def couverture(cls, villes: list[str]) -> list[str]:
+        # Villes réellement interrogées : une annonce sans ville reconnue vient forcément de l'une d'elles.
+        if cls.villes_interrogees is not None:
+            return cls.villes_interrogees
+        if cls.slugs:
+            return [ville for ville in villes if ville.lower() in cls.slugs]
+        return villes
 
     def get_slugs_villes(self) -> list[str]:
         slugs = []
@@ -31,23 +117,128 @@ class Annonces(ABC):
         pass
 
     @abstractmethod
-    def get_raw_response(self) -> dict:
+    async def aget_raw_response(self) -> dict:
         pass
 
+    def get_raw_response(self) -> dict:
+        return asyncio.run(self.aget_raw_response())
+
     def get_api_response(self, url: str) -> dict:
-        return requests.get(url).json()
+        return self.transport.get(url).json()
 
     def post_api_response(self, url: str) -> dict:
-        return requests.post(url, headers=self.request_headers(), json=self.request_body()).json()
+        return self.transport.post(url, headers=self.request_headers(), json=self.request_body()).json()
+
+    def get_html_response(self, url: str, conteneur: tuple = None) -> "BeautifulSoup":
+        debut = time.perf_counter()
+        response = self.transport.get(url)
+        self.mesurer_requete(debut, len(response.content))
+        return self.html_to_soup(response.text, conteneur)
+
+    def mesurer_requete(self, debut: float, octets: int) -> None:
+        self.metriques.duree(self.libelle, "fetch", time.perf_counter() - debut)
+        self.metriques.incrementer("annonces_requetes_total", site=self.libelle)
+        self.metriques.incrementer("annonces_octets_total", octets, site=self.libelle)
+
+    async def arequest(self, method: str, url: str, **kwargs) -> requests.Response:
+        async with self.limiteur.hote(url, self.connexions_par_hote):
+            debut = time.perf_counter()
+            response = await asyncio.to_thread(self.transport.request, method, url, **kwargs)
+        self.mesurer_requete(debut, len(response.content))
+        return response
+
+    async def aget_api_response(self, url: str) -> dict:
+        return (await self.arequest("GET", url)).json()
+
+    async def apost_api_response(self, url: str) -> dict:
+        return (await self.arequest("POST", url, headers=self.request_headers(), json=self.request_body())).json()
+
+    async def aget_cached_response(self, url: str, method: str = "GET", **kwargs) -> ReponseCachee:
+        async with self.limiteur.hote(url, self.connexions_par_hote):
+            debut = time.perf_counter()
+            reponse = await asyncio.to_thread(self.cache.request, self.transport, self.site, method, url, **kwargs)
+        self.mesurer_requete(debut, reponse.octets)
+        return reponse
 
-    def get_html_response(self, url: str) -> BeautifulSoup:
-        return BeautifulSoup(requests.get(url).text, 'html.parser')
+    async def aget_text_response(self, url: str, method: str = "GET", **kwargs) -> str:
+        return (await self.arequest(method, url, **kwargs)).text
+
+    async def aget_html_response(self, url: str) -> "BeautifulSoup":
+        return self.html_to_soup(await self.aget_text_response(url))
+
+    async def aget_page_response(self, url: str, method: str = "GET", **kwargs) -> tuple[int, dict]:
+        return await self.atraiter_page(await self.aget_text_response(url, method, **kwargs))
+
+    async def apaginer(self, get_page, old_annonces=(), debut: int = 1):
+        # Nombre de pages inconnu : on avance par fenêtres de pages concurrentes jusqu'à la
+        # première page vide. `get_page` renvoie (nb d'éléments, annonces formatées).
+        # Sur un site trié par date la fenêtre part d'une page et double, la suite étant souvent connue.
+        page = debut
+        taille = 1 if self.tri_recent else self.connexions_par_hote
+        while True:
+            for nb, annonces in await asyncio.gather(*(get_page(p) for p in range(page, page + taille))):
+                if not nb:
+                    return
+                yield annonces
+                if self.page_connue(annonces, old_annonces):
+                    return
+            page += taille
+            taille = min(taille * 2, self.connexions_par_hote)
+
+    def page_connue(self, annonces: dict, old_annonces) -> bool:
+        # Les annonces écartées au formatage ne comptent pas : une page sans annonce retenue ne prouve rien.
+        return self.tri_recent and bool(annonces) and all(ref in old_annonces for ref in annonces)
+
+    async def acollecter(self, pages) -> dict:
+        response = {}
+        async for annonces in pages:
+            response.update(annonces)
+        return response
+
+    def parse_raw_response(self, html: str) -> list:
+        return self.html_to_soup(html, self.conteneur).select(self.selecteur_annonces)
+
+    def analyser_page(self, html: str) -> tuple[int, list]:
+        elements = self.parse_raw_response(html)
+        return len(elements), elements
+
+    def traiter_page(self, html: str) -> tuple[int, dict, dict]:
+        # Les mesures reviennent avec le résultat : dans un processus fils, self n'est qu'une copie.
+        debut = time.perf_counter()
+        nb, elements = self.analyser_page(html)
+        parse = time.perf_counter()
+        filtrees = self.filtrees
+        formatted_response = self.format_raw_response(elements)
+        mesures = {"parse": parse - debut, "format": time.perf_counter() - parse, "filtrees": self.filtrees - filtrees}
+        self.filtrees = filtrees
+        return nb, formatted_response, mesures
+
+    async def atraiter_page(self, html: str) -> tuple[int, dict]:
+        # Parsing et formatage sont liés au CPU : ils partent dans le pool de processus
+        # dès que la page arrive, seules les annonces formatées reviennent.
+        if self.processus is None:
+            nb, formatted_response, mesures = await asyncio.to_thread(self.traiter_page, html)
+        else:
+            nb, formatted_response, mesures = await asyncio.get_running_loop().run_in_executor(self.processus, self.traiter_page, html)
+        self.metriques.duree(self.libelle, "parse", mesures["parse"])
+        self.metriques.duree(self.libelle, "format", mesures["format"])
+        self.filtrees += mesures["filtrees"]
+        return nb, formatted_response
+
+    async def aformater(self, raw_response) -> dict:
+        debut = time.perf_counter()
+        formatted_response = await asyncio.to_thread(self.format_raw_response, raw_response)
+        self.metriques.duree(self.libelle, "format", time.perf_counter() - debut)
+        return formatted_response
 
     def request_body(self) -> dict:
         return None
     
-    def html_to_soup(self, html: str) -> BeautifulSoup:
-        return BeautifulSoup(html, 'html.parser')
+    def html_to_soup(self, html: str, conteneur: tuple = None) -> "BeautifulSoup":
+        # Avec un conteneur, seuls les sous-arbres portant l'une de ces classes sont construits.
+        from bs4 import BeautifulSoup
+        parse_only = strainer(conteneur) if conteneur else None
+        return BeautifulSoup(html, self.parser, parse_only=parse_only)
 
     def request_headers(self) -> dict:
         return None
@@ -56,691 +247,64 @@ class Annonces(ABC):
     def format_raw_response(self, raw_response: dict) -> dict:
         pass
 
+    @classmethod
+    def configurer_redibitoires(cls, redibitoires: list[str]) -> None:
+        Annonces.redibitoires = list(redibitoires)
+        Annonces.filtre = FiltreRedibitoire(redibitoires)
+
     def is_redibitoire(self, description):
-        for redibitoire in self.redibitoires:
-            if redibitoire in description.lower():
-                return True
-        return False
+        redibitoire = self.filtre(description)
+        self.filtrees += redibitoire
+        return redibitoire
+
+    def filter_raw_response(self, raw_response: dict, old_annonces: dict) -> dict:
+        return raw_response
 
     def extract_new_annonces(self, formatted_response: dict, old_annonces: dict) -> dict:
         new_annonces = {ref: annonce for ref, annonce in formatted_response.items(
         ) if ref not in old_annonces}
         return new_annonces
 
+    def criteres(self) -> list:
+        return [self.villes, self.prix, self.surface, self.redibitoires, version_extraction(type(self))]
+
     def merge_annonces(self, new_annonces: dict, old_annonces: dict) -> dict:
         return old_annonces.update(new_annonces)
 
     def get_new_annonces(self, old_annonces: dict) -> dict:
-        raw_response = self.get_raw_response()
-        formatted_response = self.format_raw_response(raw_response)
-        new_annonces = self.extract_new_annonces(
-            formatted_response, old_annonces)
-        return new_annonces
-
-
-class SergicAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        return super().__init__("Sergic", villes, prix, surface)
-
-    def query_url(self, ville: str) -> str:
-        return f'https://www.sergic.com/wp-json/sergic/v1/post?params[contract_type]=location&params[place_types][]=appartement&params[dispo]=all&params[localisation_srch]=false&params[professional_announcement]=false&params[expanse_srch]=0&params[appt_min_area]={self.surface}&params[price_min]=0&params[price_max]={self.prix}&params[ref]=&params[isRef]=false&params[zoomed]=&params[citySearch]={ville}&params[place]=&params[lat_move_map]=&params[lng_move_map]=&params[zoom_move_map]=&params[agency_siret]='
-
-    def get_raw_response(self) -> dict:
-        response = []
-        for ville in self.villes:
-            target_url = self.query_url(ville)
-            api_resp = self.get_api_response(target_url)
-            if isinstance(api_resp, bool):
-                print(f"La ville {ville} n'a pas de résultats")
-                continue
-            response += self.get_api_response(target_url)
-        return response
-
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            annonce_html = self.get_html_response(annonce["link"])
-            description = annonce_html.find(
-                "div", {"class": "appt-desc__description-text-paragraph"}).text
-            if self.is_redibitoire(description):
-                continue
-            images = [image["src"] for image in annonce_html.select(
-                ".appt-desc__carousel-container img")]
-            annonce_obj: Annonce = Annonce(
-                reference=annonce["ref"],
-                ville=annonce["city"],
-                prix=annonce["price"],
-                surface=annonce["area"],
-                url=annonce["link"],
-                description=description,
-                images=images,
-                coordonnees=(annonce["lat"], annonce["lng"]),
-                disponibilite=annonce["disponibility"]
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-
-
-class FonciaAnnonces(Annonces):
-    slugs = {
-        'lille': 'lille-59',
-        'la madeleine': 'la-madeleine-59110'
-    }
-
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Foncia', villes, prix, surface)
-
-    def query_url(self) -> str:
-        return "https://fnc-api.prod.fonciatech.net/annonces/annonces/search"
-
-    def request_body(self) -> dict:
-        slugs = self.get_slugs_villes()
-        return {
-            "type": "location",
-            "filters": {
-                "localities": {
-                    "slugs": slugs
-                },
-                "surface": {
-                    "min": self.surface
-                },
-                "prix": {
-                    "max": self.prix
-                }
-            },
-            "expandNearby": False,
-            "size": 100
-        }
-
-    def get_raw_response(self) -> dict:
-        resp = self.post_api_response(self.query_url())
-        return resp
-
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response["annonces"]:
-            description = annonce["description"]
-            if self.is_redibitoire(description):
-                continue
-            images = annonce["medias"] if "medias" in annonce else []
-            annonce_obj: Annonce = Annonce(
-                reference=annonce["reference"],
-                ville=annonce["localisation"]["locality"]["libelle"],
-                prix=annonce["loyer"],
-                surface=annonce["surface"]["totale"],
-                url=f'https://fr.foncia.com{annonce["canonicalUrl"]}',
-                description=description,
-                images=images,
-                publication=annonce["datePublication"],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-
-
-class CityaAnnonces(Annonces):
-    slugs = {
-        'lille': 'lille-59350',
-        'la madeleine': 'la-madeleine-59110'
-    }
-
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Citya', villes, prix, surface)
-
-    def query_url(self, page) -> str:
-        slugs = self.get_slugs_villes()
-        villes = ','.join(slugs)
-        return f"https://www.citya.com/annonces/location/{villes}?l&prixMax={self.prix}&surfaceMin={self.surface}&page={page}"
-
-    def get_raw_response(self) -> list:
-        response = []
-        page = 1
-        while True:
-            page_resp = self.get_html_response(self.query_url(page))
-            annonces = page_resp.select("ul.list-biens > li > article")
-            if not annonces:
-                break
-            response += annonces
-            page += 1
-        return response
-
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce.find("p", class_="description-start").text
-            if self.is_redibitoire(description):
-                continue
-            url = annonce.find("a").get("href")
-            ref = url.split("/")[-1]
-            prix = annonce.find("p", class_="prix").text.split(" ")[0][:-2]
-            surface = annonce.select_one(
-                "h3 > strong").text.split(" ")[-1][:-2]
-            ville = " ".join(annonce.find(
-                "p", class_="ville").text.split(" ")[:-1])
-            annonce_obj: Annonce = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=surface,
-                url=f'https://www.citya.com{url}',
-                description=description,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-
-
-class VacherandAnnonces(Annonces):
-    slugs = {
-        'lille': 6,
-        'la madeleine': 19
-    }
-
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Vacherand', villes, prix, surface)
-
-    def query_url(self, page) -> str:
-        return f'https://www.vacherand.fr/achat-location-biens-immobiliers-page-{page}'
-
-    def request_body(self) -> dict:
-        return {
-            "rech": "ok", 
-            "transaction": "location", 
-            "id_type[]": 2, 
-            "prix_max": self.prix, 
-            "id_ville[]": self.get_slugs_villes(), 
-            "surface_min": self.surface}
-        
-    def request_headers(self) -> dict:
-        return  {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/113.0"
-        }
-
-    def get_raw_response(self) -> list:
-        response = []
-        page = 1
-        per_page = 8
-         
-        while True: 
-            page_resp = requests.post(self.query_url(page), data=self.request_body()).text
-            soup = self.html_to_soup(page_resp)
-            nb = int(soup.find("h1", class_="ti30").text.split(" ")[0])
-            annonces = soup.select(".liste_biens article") 
-            response += annonces
-            if nb <= page * per_page:
-                break
-            page += 1
-        return response
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce.find("div", class_="description").text
-            if self.is_redibitoire(description):
-                continue
-            url = annonce.select_one("a.detail").get("href")
-            ref = url.split("/ref-")[-1]
-            prix = annonce.find("span", class_="prix").text.split(" ")[0]
-            ti18 = annonce.find("h3", class_="ti18").text
-            surface = ti18.split("m²")[0].split(" ")[-1]
-            ville = ti18.split("m²")[1].strip()
-            images = [image.get("src") for image in annonce.select(".bien img")]
-            annonce_obj: Annonce = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=surface,
-                url=f'https://www.vacherand.fr/{url}',
-                description=description,
-                images=images,
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-   
- 
-class LedouxAnnonces(Annonces):
-    slugs = {
-        'lille': 59350,
-        'la madeleine': 59368
-    }
-    
-    
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Cabinet Ledoux', villes, prix, surface)   
-        
-
-    def query_url(self, page) -> str:
-        insee = "&".join([f"insee[]={slug}" for slug in self.get_slugs_villes()])
-        
-        return f"https://www.ledoux.fr/fr/data_listing_formrecherche.html?{insee}&prixmax={self.prix}&surfacemin={self.surface}?page={page}"
-    
-    def get_raw_response(self) -> dict:
-        response = []
-        page = 1
-        while True:
-            page_resp = requests.get(self.query_url(page)).json()
-            last_page = page_resp["data"]["resultats"]["last_page"]
-            response += page_resp["data"]["resultats"]["data"]
-            page += 1
-            if page > last_page:
-                break
-        return response
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce["descriptif"]
-            if self.is_redibitoire(description):
-                continue
-            url = f'{annonce["type"]}-{annonce["loc"]}-{annonce["ville"]}-{annonce["cpdep"]}-{annonce["idhabit"]}.html'.replace(" ","-")
-            annonce_obj: Annonce = Annonce(
-                reference=str(annonce["idhabit"]),
-                ville = annonce["ville"],
-                prix=annonce["prix"],
-                surface=annonce["surface"],
-                url=f'https://www.ledoux.fr/{url}',
-                description=description,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-
-class ImmoDeFranceAnnonces(Annonces):
-    slugs = {
-        'lille': 24453,
-        'la madeleine': 24471
-    }
-    
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Immo de France', villes, prix, surface)
-        
-    def query_url(self, page) -> str:
-        return "https://www.immodefrance.com/fr/locations"
-    
-    def request_body(self, ville) -> dict:
-        slug = self.slugs[ville.lower()]
-        return {
-            "location_search[commune]": slug,
-            "location_search[rayonCommune]": 0,
-            "location_search[typeBien][]": 1,
-            "location_search[surface_min]": self.surface,
-            "location_search[loyer_max]": self.prix
-        }
-        
-    def get_raw_response(self) -> dict:
-        response = []
-        
-class LilleImmoAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Lille Immo', villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return f"https://www.lille-immo.fr/produits.php?ff=hab&transaction_hab=L&type_hab[]=A&type_hab[]=S&type_hab[]=T1&type_hab[]=T2&type_hab[]=T3&type_hab[]=T4&type_hab[]=T5&type_hab[]=D&ville_hab=LILLE&min_price_loc_hab=0&max_price_loc_hab={self.prix}"
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".annonce")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce.find("div", class_="desc_hover_wrap").text
-            if self.is_redibitoire(description):
-                continue
-            url = annonce.select_one("a.cursor").get("href")
-            ref = annonce.get("id")
-            prix = annonce.find("p", class_="price").text.split(" ")[0]
-            surface = annonce.select_one('ul li').text.split("m²")[0].split(" ")[-1]
-            if int(surface) < self.surface:
-                continue
-            ville = annonce.select_one(".desc h2 strong").text.split("à")[1].strip()
-            images = []
-            annonce_obj: Annonce = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=surface,
-                url=url,
-                description=description,
-                images=images,
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-    
-class OrpiAnnonces(Annonces):
-    def  __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Orpi', villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return f'https://www.orpi.com/recherche/ajax/rent?realEstateTypes[]=appartement&locations[0][value]=lille&locations[0][label]=Lille (59000)&locations[1][value]=la-madeleine&locations[1][label]=La Madeleine (59110)&minSurface={self.surface}&maxPrice={self.prix}&sort=date-down&layoutType=mixte&recentlySold=false'
-    
-    def get_raw_response(self) -> dict:
-        return self.get_api_response(self.query_url())
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response["items"]:
-            description = annonce["longAd"]
-            if self.is_redibitoire(description):
-                continue
-
-            annonce_obj: Annonce = Annonce(
-                reference=annonce['reference'],
-                ville=annonce['location'],
-                prix=annonce['price'],
-                surface=annonce['surface'],
-                url=f'https://www.orpi.com/annonce-location-{annonce["slug"]}',
-                description=description,
-                images=annonce['images'],
-                coordonnees=(annonce['latitude'], annonce['longitude']),
-            )
-            formatted_response.update(annonce_obj.dict())
+        return asyncio.run(self.aget_new_annonces(old_annonces))
+
+    async def aformat_raw_response(self, raw_response) -> dict:
+        # Les sites HTML renvoient des pages déjà parsées et formatées par atraiter_page.
+        if self.selecteur_annonces:
+            return raw_response
+        return await self.aformater(raw_response)
+
+    async def aget_formatted_response(self, old_annonces: dict) -> dict:
+        if not self.cache_http:
+            raw_response = self.filter_raw_response(await self.aget_raw_response(), old_annonces)
+            return await self.aformat_raw_response(raw_response)
+        # Page inchangée (304 ou octets identiques) : on réutilise le résultat formaté sans parser.
+        reponse = await self.aget_cached_response(self.query_url())
+        formatted_response = self.cache.formatted(reponse, self.criteres())
+        if formatted_response is not None:
+            return {ref: Annonce(reference=ref, **valeurs) for ref, valeurs in formatted_response.items()}
+        _, formatted_response = await self.atraiter_page(reponse.text)
+        self.cache.store_formatted(reponse, self.criteres(), {ref: annonce.valeurs() for ref, annonce in formatted_response.items()})
         return formatted_response
-    
-class NexityAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Nexity', villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return f"https://www.nexity.fr/annonces-immobilieres/location/immobilier/tout/france?budget_max={self.prix}&locationsId%5B0%5D=29397&locationsId%5B1%5D=29399&surface_min={self.surface}&types_bien%5B0%5D=appartement"
 
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".product")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            link = annonce.select_one("a").get("href")
-            ref = link.split("/")[-1]
-            card = annonce.select_one(".product-card-content")
-            if not card : continue
-            prix = card.select_one(".pricing").text.split("€")[0].strip()
-            ville = annonce.select_one(".location").text.split(" ")[0]
-            surface = annonce.select_one(".details").text.split(" | ")[-1].split("m")[0]
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=surface,
-                url=f'https://www.nexity.fr{link}',
-                description="",
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-    
-class GLVAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__("GLV Immobilier", villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return f"https://www.glv-immobilier.fr/catalog/advanced_search_result.php?action=update_search&search_id=1775915508437856&C_28_search=EGAL&C_28_type=UNIQUE&C_28=Location&C_28_tmp=Location&C_65_search=CONTIENT&C_65_type=TEXT&C_65=59110+LA-MADELEINE%2C59000+LILLE&C_65_tmp=59110+LA-MADELEINE&C_65_tmp=59000+LILLE&C_27_search=EGAL&C_27_type=TEXT&C_27=1&C_27_tmp=1&C_34_MIN={self.surface}&C_34_search=COMPRIS&C_34_type=NUMBER&C_30_MAX={self.prix}&keywords=&C_34_MAX=&C_30_MIN=&C_30_search=COMPRIS&C_30_type=NUMBER&C_36_MIN=&C_36_search=COMPRIS&C_36_type=NUMBER&C_36_MAX="
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".item-card")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce.select_one(".products-description").text
-            if self.is_redibitoire(description):
-                continue
-            link = annonce.select("a")[1].get("href")[2:]
-            ref = annonce.select_one(".products-ref").text.split(" : ")[-1].strip()
-            prix = annonce.select_one(".price-bold").text.split(" ")[0]
-            ville = annonce.select_one(".products-city").text
-            surface = None
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=surface,
-                url=f'https://www.glv-immobilier.fr{link}',
-                description="",
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-        
-class CavroisAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__('Cavrois', villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return "https://www.cavrois-immobilier.fr/catalog/advanced_search_result.php?action=update_search&search_id=&map_polygone=&C_28_search=EGAL&C_28_type=UNIQUE&C_28=Location&C_28_tmp=Location&C_27_search=EGAL&C_27_type=TEXT&C_27=1&C_27_tmp=1&C_34_MIN=20&C_34_search=COMPRIS&C_34_type=NUMBER&C_30_search=COMPRIS&C_30_type=NUMBER&C_30_MAX=850&C_65_search=CONTIENT&C_65_type=TEXT&C_65=59800%20LILLE%2C59000%20LILLE&C_65_tmp=59000%20LILLE&keywords=&C_30_MIN=&C_33_search=COMPRIS&C_33_type=NUMBER&C_33_MIN=&C_33_MAX=&C_34_MAX=&C_36_MIN=&C_36_search=COMPRIS&C_36_type=NUMBER&C_36_MAX=&C_38_MAX=&C_38_MIN=&C_38_search=COMPRIS&C_38_type=NUMBER&C_47_type=NUMBER&C_47_search=COMPRIS&C_47_MIN=&C_94_type=FLAG&C_94_search=EGAL&C_94=&page=1&search_id=1777816358652914&sort=0"
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".item-product")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce.select_one(".products-desc").text
-            if self.is_redibitoire(description):
-                continue
-            link = annonce.select("a")[1].get("href")[2:]
-            ref = annonce.select_one(".products-ref").text.split(" : ")[-1].strip()
-            prix = annonce.select_one(".products-price").text.split(" ")[1].split("\xa0\x80")[0]
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=None,
-                prix=prix,
-                surface=None,
-                url=f'https://www.cavrois-immobilier.fr{link}',
-                description=description,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-        
-class DefranceImmoAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__("Defrance Immo", villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return "http://www.defranceimmo.fr/location-appartement-maison-parking-commerce-metropole-lille.html"
-    
-    def request_body(self) -> dict:
-        bod = {
-            "Categorie[Appartement]": "1",
-            "Ville[La+madeleine]": "1",
-            "Ville[Lille]": "1",
-            "Prix[min]": "0",
-            "Prix[max]": f"{self.prix}",
-            "recherche": "1"
-        }
-        return bod
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.post(self.query_url(), data=self.request_body()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".bien")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            link = annonce.select_one("a").get("href")
-            ref = annonce.select_one(".ref").text.split(" : ")[-1]
-            prix = annonce.select_one(".big").text.replace("€", "")
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=None,
-                prix=prix,
-                surface=None,
-                url=f'http://www.defranceimmo.fr/{link}',
-                description=None,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-    
-    
-class SeizeAnnonces(Annonces):
-    def __init__(self: str, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__("Seize Immo", villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return f"https://www.seize-immobilier.com/catalog/advanced_search_result.php?action=update_search&search_id=1777818247876088&C_28_search=EGAL&C_28_type=UNIQUE&C_28=Location&C_28_tmp=Location&C_65_search=CONTIENT&C_65_type=TEXT&C_65=59110+LA-MADELEINE%2CLILLE&C_65_tmp=59110+LA-MADELEINE&C_65_tmp=LILLE&C_27_search=EGAL&C_27_type=TEXT&C_27=1&C_27_tmp=1&C_34_MIN={self.surface}&C_34_search=COMPRIS&C_34_type=NUMBER&C_30_MAX={self.prix}&keywords=&C_34_MAX=&C_30_MIN=&C_30_search=COMPRIS&C_30_type=NUMBER&C_36_MIN=&C_36_search=COMPRIS&C_36_type=NUMBER&C_36_MAX="
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".link-product")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            link = annonce.select("a")[1].get("href")[2:]
-            prix = "".join(annonce.select_one(".product-price").text.split(" ")[1:-2])
-            ville = annonce.select_one(".product-name").text.split(',')[-1].strip()
-
-            surface = annonce.select_one(".data-list__item--Surface").select_one('.data-list__item--value').text.strip()
-            ref = annonce.select_one(".data-list__item--products_model").select_one('.data-list__item--value').text.strip()    
-            surface = None
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=surface,
-                url=f'https://www.seize-immobilier.com{link}',
-                description=None,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-    
-class FaelensAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__("Faelens", villes, prix, surface)
-        
-    def budget(self):
-        if self.prix < 500 : return 6
-        if self.prix < 850 : return 7
-        if self.prix < 1000 : return 8
-        return 9
-        
-        
-    def query_url(self) -> str:
-        return f"https://www.faelensimmobilier.com/site/produits.php?tri=&transac=Location&type=Appartement&budget_v=5&budget_l={self.budget()}"
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".item")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            link = annonce.select_one("a").get("href")
-            ref = annonce.select_one(".ref").text.split(" ")[-1]
-            prix = annonce.select_one(".prix").select_one(".bold").text.replace("€", "").replace(" ", "")
-            if int(prix) > self.prix : continue
-            ville = annonce.select_one(".type").select_one(".semibold").text
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=None,
-                url=f'https://www.faelensimmobilier.com/site/{link}',
-                description=None,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-    
-class CImmoAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__("C Immo", villes, prix, surface)
-        
-    def query_url(self) -> str:
-        return f"https://www.cimmobilier.fr/locations.php?Ville=LILLE&Categorie=Appartement&Type=&PrixMini=&PrixMaxi={self.prix}"
-    
-    def get_raw_response(self) -> dict:
-        page_resp = requests.get(self.query_url()).text
-        soup = self.html_to_soup(page_resp)
-        annonces = soup.select(".masonry-item")
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            description = annonce.select_one(".overlay-content").text
-            link = annonce.select_one("a").get("href")
-            ref = link.split(".")[-2].split('-ref')[-1]
-            prix = link.split("-")[-2].replace('E',"")
-            ville = None
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=None,
-                url=f'https://www.cimmobilier.fr/{link}',
-                description=description,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
-            
-            
-class ChoquetAnnonces(Annonces):
-    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
-        super().__init__("Cabinet Choquet", villes, prix, surface)
-        
-    def query_url(self, offset) -> str:
-        return f"https://www.cabinet-choquet.com/locations.php?Categorie=Toutes&OrderBy=2&Mode=2&LimitDebut={offset}"
-    
-    def get_raw_response(self) -> dict:
-        annonces = []
-        while 1:
-            page_resp = requests.get(self.query_url(len(annonces))).text
-            soup = self.html_to_soup(page_resp)
-            page_annonces = soup.select(".product-thumb")
-            if not page_annonces : break
-            annonces += page_annonces
-        return annonces
-    
-    def format_raw_response(self, raw_response: dict) -> dict:
-        formatted_response = {}
-        for annonce in raw_response:
-            if annonce.find("span", class_="product-label") : 
-                continue
-            ville = annonce.select_one(".product-title").text
-            if ville.lower() not in [ville.lower() for ville in self.villes] : 
-                continue
-            description = annonce.select_one(".product-desciption").text
-            if self.is_redibitoire(description) : 
-                continue
-            if "Loué" in description :
-                continue            
-            link = annonce.get("onclick").split("'")[1]
-            ref = annonce.select_one(".product-category").text.split(" : ")[-1]
-            prix_div = annonce.select_one(".product-price").text
-            hc = "".join(c for c in prix_div.split("+")[0] if c.isdigit())
-            c = "".join(c for c in prix_div.split("+")[1] if c.isdigit())
-            prix = int(hc) + int(c)
-            if int(prix) > self.prix or prix < 300:
-                continue
-            annonce_obj = Annonce(
-                reference=ref,
-                ville=ville,
-                prix=prix,
-                surface=None,
-                url=f'https://www.cabinet-choquet.com/{link}',
-                description=description,
-                images=[],
-            )
-            formatted_response.update(annonce_obj.dict())
-        return formatted_response
\ No newline at end of file
+    async def aiter_pages(self, old_annonces: dict):
+        # Les sites paginés renvoient leurs annonces formatées page par page.
+        yield await self.aget_formatted_response(old_annonces)
+
+    async def aget_new_annonces(self, old_annonces: dict) -> dict:
+        new_annonces = {}
+        vues = 0
+        async for formatted_response in self.aiter_pages(old_annonces):
+            vues += len(formatted_response)
+            new_annonces.update(self.extract_new_annonces(
+                formatted_response, old_annonces))
+        self.metriques.incrementer("annonces_vues_total", vues, site=self.libelle)
+        self.metriques.incrementer("annonces_nouvelles_total", len(new_annonces), site=self.libelle)
+        self.metriques.incrementer("annonces_filtrees_total", self.filtrees, site=self.libelle)
+        return new_annonces
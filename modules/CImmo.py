@@ -0,0 +1,40 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class CImmoAnnonces(Annonces):
+    villes_interrogees = ["Lille"]
+    cache_http = True
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__("C Immo", villes, prix, surface)
+        
+    def query_url(self) -> str:
+        return f"https://www.cimmobilier.fr/locations.php?Ville=LILLE&Categorie=Appartement&Type=&PrixMini=&PrixMaxi={self.prix}"
+    
+    selecteur_annonces = ".masonry-item"
+    conteneur = ("masonry-item",)
+
+    async def aget_raw_response(self) -> dict:
+        _, annonces = await self.aget_page_response(self.query_url())
+        return annonces
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            description = annonce.select_one(".overlay-content").text
+            link = annonce.select_one("a").get("href")
+            ref = link.split(".")[-2].split('-ref')[-1]
+            prix = link.split("-")[-2].replace('E',"")
+            ville = None
+            annonce_obj = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=None,
+                url=f'https://www.cimmobilier.fr/{link}',
+                description=description,
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
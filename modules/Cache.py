@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from modules.Transport import Transport
+
+
+class ReponseCachee:
+    def __init__(self, cle: str, text: str, etat: str, octets: int = 0) -> None:
+        self.cle = cle
+        self.text = text
+        self.etat = etat
+        self.octets = octets
+
+    @property
+    def inchangee(self) -> bool:
+        return self.etat in ("hit", "revalide")
+
+
+class CacheHttp:
+    def __init__(self, dossier: str, taille_max: int = 50 * 1024 * 1024) -> None:
+        self.dossier = dossier
+        self.taille_max = taille_max
+        self.verrou = threading.Lock()
+        self.stats: dict[str, dict[str, int]] = {}
+        self.index_file = os.path.join(dossier, "index.json")
+        self.index = json.load(open(self.index_file)) if os.path.isfile(self.index_file) else {}
+
+    def cle(self, method: str, url: str, data=None, json_body=None) -> str:
+        corps = json.dumps([data, json_body], sort_keys=True, default=str)
+        return hashlib.sha1(f"{method.upper()} {url} {corps}".encode()).hexdigest()
+
+    def chemin(self, cle: str, extension: str) -> str:
+        return os.path.join(self.dossier, f"{cle}.{extension}")
+
+    def request(self, transport: Transport, site: str, method: str, url: str, **kwargs) -> ReponseCachee:
+        cle = self.cle(method, url, kwargs.get("data"), kwargs.get("json"))
+        with self.verrou:
+            entree = dict(self.index.get(cle, {}))
+        if entree and not os.path.isfile(self.chemin(cle, "body")):
+            entree = {}
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entree.get("etag"):
+            headers["If-None-Match"] = entree["etag"]
+        if entree.get("last_modified"):
+            headers["If-Modified-Since"] = entree["last_modified"]
+
+        response = transport.request(method, url, headers=headers, **kwargs)
+        if response.status_code == 304 and entree:
+            text = open(self.chemin(cle, "body"), encoding="utf-8").read()
+            etat = "revalide"
+        else:
+            text = response.text
+            empreinte = hashlib.sha1(response.content).hexdigest()
+            etat = "hit" if entree.get("empreinte") == empreinte else "miss"
+            if response.status_code == 200:
+                if etat == "miss":
+                    os.makedirs(self.dossier, exist_ok=True)
+                    with open(self.chemin(cle, "body"), "w", encoding="utf-8") as f:
+                        f.write(text)
+                    entree = {"empreinte": empreinte, "taille": len(response.content)}
+                entree["etag"] = response.headers.get("ETag")
+                entree["last_modified"] = response.headers.get("Last-Modified")
+
+        entree["acces"] = time.time()
+        with self.verrou:
+            self.index[cle] = entree
+            compteurs = self.stats.setdefault(site, {"hit": 0, "miss": 0, "revalide": 0})
+            compteurs[etat] += 1
+            self.evict()
+            self.save()
+        return ReponseCachee(cle, text, etat, len(response.content))
+
+    def criteres_cle(self, criteres) -> str:
+        return hashlib.sha1(json.dumps(criteres, sort_keys=True, default=str).encode()).hexdigest()
+
+    def formatted(self, reponse: ReponseCachee, criteres) -> dict:
+        # Le résultat formaté n'est réutilisable que si la page et les critères, version du code
+        # d'extraction comprise, sont inchangés.
+        chemin = self.chemin(reponse.cle, "json")
+        if not reponse.inchangee or not os.path.isfile(chemin):
+            return None
+        stocke = json.load(open(chemin, encoding="utf-8"))
+        if stocke["criteres"] != self.criteres_cle(criteres):
+            return None
+        return stocke["formatted"]
+
+    def store_formatted(self, reponse: ReponseCachee, criteres, formatted: dict) -> None:
+        chemin = self.chemin(reponse.cle, "json")
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump({"criteres": self.criteres_cle(criteres), "formatted": formatted}, f)
+        with self.verrou:
+            if reponse.cle in self.index:
+                self.index[reponse.cle]["taille_formatted"] = os.path.getsize(chemin)
+            self.save()
+
+    def taille(self) -> int:
+        return sum(entree.get("taille", 0) + entree.get("taille_formatted", 0) for entree in self.index.values())
+
+    def evict(self) -> None:
+        taille = self.taille()
+        for cle, entree in sorted(self.index.items(), key=lambda item: item[1]["acces"]):
+            if taille <= self.taille_max:
+                break
+            taille -= entree.get("taille", 0) + entree.get("taille_formatted", 0)
+            del self.index[cle]
+            for extension in ("body", "json"):
+                if os.path.isfile(self.chemin(cle, extension)):
+                    os.remove(self.chemin(cle, extension))
+
+    def save(self) -> None:
+        os.makedirs(self.dossier, exist_ok=True)
+        tmp = f"{self.index_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_file)
+
+
+cache = CacheHttp(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'cache'))
@@ -0,0 +1,174 @@
+import re
+from urllib.parse import quote_plus, urljoin
+
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+# Moteur déclaratif pour les agences sur la plateforme "catalog/advanced_search_result.php" :
+# une agence se décrit par son gabarit d'URL, ses slugs de villes et ses champs.
+
+NOMBRE = re.compile(r"\d[\d \xa0 ]*(?:[.,]\d+)?")
+CLASSE_SEULE = re.compile(r"\.([\w-]+)")
+BALISE_SEULE = re.compile(r"[a-z][a-z0-9]*")
+DERNIERE_CLASSE = re.compile(r"\.([\w-]+)$")
+
+
+def texte(element) -> str:
+    return element.get_text().strip()
+
+
+def apres_deux_points(element) -> str:
+    # "Réf : 12345" -> "12345"
+    return element.get_text().split(" : ")[-1].strip()
+
+
+def apres_virgule(element) -> str:
+    # "Appartement, Lille" -> "Lille"
+    return element.get_text().split(",")[-1].strip()
+
+
+def montant(element) -> str:
+    # Premier nombre du texte, séparateurs de milliers compris : "Loyer 1 050 € /mois" -> "1 050"
+    trouve = NOMBRE.search(element.get_text())
+    return trouve.group().strip() if trouve else None
+
+
+def lien(element) -> str:
+    return element.get("href")
+
+
+EXTRACTEURS = {
+    "texte": texte,
+    "apres_deux_points": apres_deux_points,
+    "apres_virgule": apres_virgule,
+    "montant": montant,
+    "lien": lien,
+}
+
+
+class Champ:
+    # `rang` : occurrence retenue quand le sélecteur correspond plusieurs fois (0 : la première).
+    def __init__(self, selecteur: str, extracteur: str = "texte", rang: int = 0) -> None:
+        self.selecteur = selecteur
+        self.extracteur = EXTRACTEURS[extracteur]
+        self.rang = rang
+        # Une classe ou une balise seule se reconnaissent sans soupsieve ; un sélecteur composé
+        # est indexé par sa dernière classe et vérifié par soupsieve sur ces seuls éléments.
+        self.simple = bool(CLASSE_SEULE.fullmatch(selecteur) or BALISE_SEULE.fullmatch(selecteur))
+        derniere = DERNIERE_CLASSE.search(selecteur)
+        self.classe = derniere.group(1) if derniere else None
+        self.balise = selecteur if BALISE_SEULE.fullmatch(selecteur) else None
+        self.compile = None
+
+
+class SpecCatalogue:
+    def __init__(self, nom: str, domaine: str, url: str, conteneur: str, champs: dict[str, Champ], slugs: dict[str, str]) -> None:
+        self.nom = nom
+        self.domaine = domaine
+        # Gabarit avec {villes}, {villes_tmp}, {prix} et {surface}.
+        self.url = url
+        self.conteneur = conteneur
+        self.champs = champs
+        self.slugs = slugs
+        self.par_classe: dict[str, list[tuple[str, Champ]]] = None
+        self.par_balise: dict[str, list[tuple[str, Champ]]] = None
+        self.autres: list[tuple[str, Champ]] = None
+
+    def query_url(self, slugs: list[str], prix: int, surface: int) -> str:
+        villes = [ville for slug in slugs for ville in slug.split(",")]
+        return self.url.format(
+            villes=quote_plus(",".join(villes)),
+            villes_tmp="&".join(f"C_65_tmp={quote_plus(ville)}" for ville in villes),
+            prix=prix,
+            surface=surface,
+        )
+
+    def compiler(self) -> None:
+        # Une fois par spec et par processus, au premier formatage.
+        import soupsieve
+        self.par_classe, self.par_balise, self.autres = {}, {}, []
+        for nom, champ in self.champs.items():
+            if not champ.simple:
+                champ.compile = soupsieve.compile(champ.selecteur)
+            if champ.balise:
+                self.par_balise.setdefault(champ.balise, []).append((nom, champ))
+            elif champ.classe:
+                self.par_classe.setdefault(champ.classe, []).append((nom, champ))
+            else:
+                self.autres.append((nom, champ))
+
+    def extraire(self, noeud) -> dict:
+        # Un seul parcours des descendants de l'annonce : chaque élément n'est confronté
+        # qu'aux champs indexés par sa balise ou ses classes, et on s'arrête dès que tout est trouvé.
+        if self.par_classe is None:
+            self.compiler()
+        valeurs = dict.fromkeys(self.champs)
+        vus = dict.fromkeys(self.champs, 0)
+        restants = len(self.champs)
+        for element in noeud.descendants:
+            if element.name is None:
+                continue
+            candidats = self.par_balise.get(element.name, [])
+            for classe in element.get("class", ()):
+                candidats = candidats + self.par_classe.get(classe, [])
+            for nom, champ in candidats + self.autres:
+                if valeurs[nom] is not None or (champ.compile is not None and not champ.compile.match(element)):
+                    continue
+                if vus[nom] < champ.rang:
+                    vus[nom] += 1
+                    continue
+                valeurs[nom] = champ.extracteur(element) or ""
+                restants -= 1
+            if not restants:
+                break
+        if valeurs.get("url"):
+            valeurs["url"] = urljoin(f"{self.domaine}/catalog/", valeurs["url"])
+        return valeurs
+
+
+# Agences de la plateforme "catalog/advanced_search_result.php" : une nouvelle agence
+# s'ajoute par une spec (gabarit d'URL, slugs, conteneur, champs), sans code de parsing.
+CATALOGUE_URL = ("/catalog/advanced_search_result.php?action=update_search&search_id={search_id}&C_28_search=EGAL&C_28_type=UNIQUE&C_28=Location&C_28_tmp=Location"
+                 "&C_65_search=CONTIENT&C_65_type=TEXT&C_65={{villes}}&{{villes_tmp}}&C_27_search=EGAL&C_27_type=TEXT&C_27=1&C_27_tmp=1"
+                 "&C_34_MIN={{surface}}&C_34_search=COMPRIS&C_34_type=NUMBER&C_30_MAX={{prix}}&keywords=&C_34_MAX=&C_30_MIN=&C_30_search=COMPRIS&C_30_type=NUMBER"
+                 "&C_36_MIN=&C_36_search=COMPRIS&C_36_type=NUMBER&C_36_MAX=")
+
+
+class CatalogueAnnonces(Annonces):
+    spec: SpecCatalogue = None
+    cache_http = True
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.spec:
+            cls.slugs = cls.spec.slugs
+            cls.selecteur_annonces = cls.spec.conteneur
+            cls.conteneur = (cls.spec.conteneur.lstrip("."),)
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__(self.spec.nom, villes, prix, surface)
+
+    def query_url(self) -> str:
+        return self.spec.query_url(self.get_slugs_villes(), self.prix, self.surface)
+
+    async def aget_raw_response(self) -> dict:
+        _, annonces = await self.aget_page_response(self.query_url())
+        return annonces
+
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for noeud in raw_response:
+            valeurs = self.spec.extraire(noeud)
+            if not valeurs.get("reference") or self.is_redibitoire(valeurs.get("description")):
+                continue
+            annonce_obj = Annonce(
+                reference=valeurs["reference"],
+                ville=valeurs.get("ville"),
+                prix=valeurs.get("prix"),
+                surface=valeurs.get("surface"),
+                url=valeurs.get("url"),
+                description=valeurs.get("description"),
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
@@ -0,0 +1,24 @@
+from modules.Catalogue import CatalogueAnnonces, Champ, SpecCatalogue
+
+
+class CavroisAnnonces(CatalogueAnnonces):
+    spec = SpecCatalogue(
+        nom="Cavrois",
+        domaine="https://www.cavrois-immobilier.fr",
+        # Gabarit propre : le site attend aussi map_polygone et ses critères C_33, C_38, C_47 et C_94.
+        url="https://www.cavrois-immobilier.fr/catalog/advanced_search_result.php?action=update_search&search_id=&map_polygone="
+            "&C_28_search=EGAL&C_28_type=UNIQUE&C_28=Location&C_28_tmp=Location&C_27_search=EGAL&C_27_type=TEXT&C_27=1&C_27_tmp=1"
+            "&C_34_MIN={surface}&C_34_search=COMPRIS&C_34_type=NUMBER&C_30_search=COMPRIS&C_30_type=NUMBER&C_30_MAX={prix}"
+            "&C_65_search=CONTIENT&C_65_type=TEXT&C_65={villes}&{villes_tmp}&keywords=&C_30_MIN="
+            "&C_33_search=COMPRIS&C_33_type=NUMBER&C_33_MIN=&C_33_MAX=&C_34_MAX=&C_36_MIN=&C_36_search=COMPRIS&C_36_type=NUMBER&C_36_MAX="
+            "&C_38_MAX=&C_38_MIN=&C_38_search=COMPRIS&C_38_type=NUMBER&C_47_type=NUMBER&C_47_search=COMPRIS&C_47_MIN="
+            "&C_94_type=FLAG&C_94_search=EGAL&C_94=&page=1&search_id=1777816358652914&sort=0",
+        conteneur=".item-product",
+        champs={
+            "url": Champ("a", "lien", rang=1),
+            "description": Champ(".products-desc"),
+            "reference": Champ(".products-ref", "apres_deux_points"),
+            "prix": Champ(".products-price", "montant"),
+        },
+        slugs={"lille": "59800 LILLE,59000 LILLE", "la madeleine": "59110 LA-MADELEINE"},
+    )
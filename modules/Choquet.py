@@ -0,0 +1,62 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class ChoquetAnnonces(Annonces):
+    tri_recent = True
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__("Cabinet Choquet", villes, prix, surface)
+        
+    def query_url(self, offset) -> str:
+        return f"https://www.cabinet-choquet.com/locations.php?Categorie=Toutes&OrderBy=2&Mode=2&LimitDebut={offset}"
+    
+    selecteur_annonces = ".product-thumb"
+    conteneur = ("product-thumb",)
+
+    async def aget_page(self, offset: int) -> tuple[int, dict]:
+        return await self.aget_page_response(self.query_url(offset))
+
+    async def aiter_pages(self, old_annonces: dict):
+        # OrderBy=2 : les plus récentes d'abord, on ne parcourt plus tout le catalogue à chaque passage.
+        per_page, annonces = await self.aget_page(0)
+        yield annonces
+        if not per_page or self.page_connue(annonces, old_annonces) : return
+        async for annonces in self.apaginer(lambda page: self.aget_page(page * per_page), old_annonces):
+            yield annonces
+
+    async def aget_raw_response(self) -> dict:
+        return await self.acollecter(self.aiter_pages({}))
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            if annonce.find("span", class_="product-label") : 
+                continue
+            ville = annonce.select_one(".product-title").text
+            if ville.lower() not in [ville.lower() for ville in self.villes] : 
+                continue
+            description = annonce.select_one(".product-desciption").text
+            if self.is_redibitoire(description) : 
+                continue
+            if "Loué" in description :
+                continue            
+            link = annonce.get("onclick").split("'")[1]
+            ref = annonce.select_one(".product-category").text.split(" : ")[-1]
+            prix_div = annonce.select_one(".product-price").text
+            hc = "".join(c for c in prix_div.split("+")[0] if c.isdigit())
+            c = "".join(c for c in prix_div.split("+")[1] if c.isdigit())
+            prix = int(hc) + int(c)
+            if int(prix) > self.prix or prix < 300:
+                continue
+            annonce_obj = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=None,
+                url=f'https://www.cabinet-choquet.com/{link}',
+                description=description,
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
@@ -0,0 +1,55 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class CityaAnnonces(Annonces):
+    slugs = {
+        'lille': 'lille-59350',
+        'la madeleine': 'la-madeleine-59110'
+    }
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Citya', villes, prix, surface)
+
+    def query_url(self, page) -> str:
+        slugs = self.get_slugs_villes()
+        villes = ','.join(slugs)
+        return f"https://www.citya.com/annonces/location/{villes}?l&prixMax={self.prix}&surfaceMin={self.surface}&page={page}"
+
+    selecteur_annonces = "ul.list-biens > li > article"
+    conteneur = ("list-biens",)
+
+    async def aget_page(self, page: int) -> tuple[int, dict]:
+        return await self.aget_page_response(self.query_url(page))
+
+    async def aiter_pages(self, old_annonces: dict):
+        async for annonces in self.apaginer(self.aget_page, old_annonces):
+            yield annonces
+
+    async def aget_raw_response(self) -> dict:
+        return await self.acollecter(self.aiter_pages({}))
+
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            description = annonce.find("p", class_="description-start").text
+            if self.is_redibitoire(description):
+                continue
+            url = annonce.find("a").get("href")
+            ref = url.split("/")[-1]
+            prix = annonce.find("p", class_="prix").text.split(" ")[0][:-2]
+            surface = annonce.select_one(
+                "h3 > strong").text.split(" ")[-1][:-2]
+            ville = " ".join(annonce.find(
+                "p", class_="ville").text.split(" ")[:-1])
+            annonce_obj: Annonce = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=surface,
+                url=f'https://www.citya.com{url}',
+                description=description,
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
@@ -0,0 +1,48 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class DefranceImmoAnnonces(Annonces):
+    villes_interrogees = ["Lille", "La Madeleine"]
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__("Defrance Immo", villes, prix, surface)
+        
+    def query_url(self) -> str:
+        return "http://www.defranceimmo.fr/location-appartement-maison-parking-commerce-metropole-lille.html"
+    
+    def request_body(self) -> dict:
+        bod = {
+            "Categorie[Appartement]": "1",
+            "Ville[La+madeleine]": "1",
+            "Ville[Lille]": "1",
+            "Prix[min]": "0",
+            "Prix[max]": f"{self.prix}",
+            "recherche": "1"
+        }
+        return bod
+    
+    selecteur_annonces = ".bien"
+    conteneur = ("bien",)
+
+    async def aget_raw_response(self) -> dict:
+        _, annonces = await self.aget_page_response(self.query_url(), "POST", data=self.request_body())
+        return annonces
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            link = annonce.select_one("a").get("href")
+            ref = annonce.select_one(".ref").text.split(" : ")[-1]
+            prix = annonce.select_one(".big").text.replace("€", "")
+            annonce_obj = Annonce(
+                reference=ref,
+                ville=None,
+                prix=prix,
+                surface=None,
+                url=f'http://www.defranceimmo.fr/{link}',
+                description=None,
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+FERME, OUVERT, SEMI_OUVERT = "ferme", "ouvert", "semi-ouvert"
+
+
+class Disjoncteur:
+    # Après `seuil` échecs consécutifs, le site n'est plus interrogé pendant `duree` secondes.
+    # Ensuite un seul passage d'essai (semi-ouvert) : réussi, tout repart ; raté, le site
+    # est de nouveau coupé pour une durée doublée, jusqu'à `duree_max`.
+    def __init__(self, seuil: int = 3, duree: float = 30 * 60, duree_max: float = 24 * 3600) -> None:
+        self.seuil = seuil
+        self.duree_base = duree
+        self.duree_max = duree_max
+        self.etat = FERME
+        self.echecs = 0
+        self.duree = duree
+        self.reouverture: float = None
+
+    def attente(self, maintenant: float = None) -> float:
+        # 0 si un passage est permis maintenant, sinon le temps restant avant l'essai.
+        if self.etat == OUVERT:
+            restant = self.reouverture - (maintenant if maintenant is not None else time.time())
+            if restant > 0:
+                return restant
+            self.etat = SEMI_OUVERT
+        return 0.0
+
+    def succes(self) -> None:
+        self.etat = FERME
+        self.echecs = 0
+        self.duree = self.duree_base
+        self.reouverture = None
+
+    def echec(self, maintenant: float = None) -> bool:
+        # Renvoie True si le disjoncteur vient de s'ouvrir.
+        self.echecs += 1
+        if self.etat == SEMI_OUVERT:
+            self.duree = min(self.duree * 2, self.duree_max)
+        elif self.echecs < self.seuil:
+            return False
+        self.etat = OUVERT
+        self.reouverture = (maintenant if maintenant is not None else time.time()) + self.duree
+        return True
+
+    def etat_json(self) -> dict:
+        return {"etat": self.etat, "echecs": self.echecs, "duree": self.duree, "reouverture": self.reouverture}
+
+    def restaurer(self, etat: dict) -> None:
+        self.etat = etat.get("etat", FERME)
+        self.echecs = etat.get("echecs", 0)
+        self.duree = etat.get("duree", self.duree_base)
+        self.reouverture = etat.get("reouverture")
+
+
+class Disjoncteurs:
+    # Un disjoncteur par site, sauvegardé à chaque changement : un site coupé le reste après
+    # un redémarrage au lieu de coûter un timeout complet dès la première boucle.
+    def __init__(self, fichier: str = None, **reglages) -> None:
+        self.fichier = fichier
+        self.reglages = reglages
+        self.disjoncteurs: dict[str, Disjoncteur] = {}
+        if fichier and os.path.isfile(fichier):
+            with open(fichier, encoding="utf-8") as f:
+                for site, etat in json.load(f).items():
+                    self[site].restaurer(etat)
+
+    def __getitem__(self, site: str) -> Disjoncteur:
+        if site not in self.disjoncteurs:
+            self.disjoncteurs[site] = Disjoncteur(**self.reglages)
+        return self.disjoncteurs[site]
+
+    def attente(self, site: str) -> float:
+        return self[site].attente()
+
+    def succes(self, site: str) -> None:
+        disjoncteur = self[site]
+        changement = disjoncteur.etat != FERME or disjoncteur.echecs
+        disjoncteur.succes()
+        if changement:
+            self.sauver()
+
+    def echec(self, site: str) -> bool:
+        ouvert = self[site].echec()
+        self.sauver()
+        return ouvert
+
+    def sauver(self) -> None:
+        if not self.fichier:
+            return
+        tmp = f"{self.fichier}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({site: disjoncteur.etat_json() for site, disjoncteur in self.disjoncteurs.items()}, f, indent=1)
+        os.replace(tmp, self.fichier)
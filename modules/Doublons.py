@@ -0,0 +1,112 @@
+import random
+import struct
+import time
+import zlib
+from collections import defaultdict
+
+from modules.Annonce import Annonce, nombre
+from modules.Filtre import mots
+
+PREMIER = (1 << 61) - 1
+
+
+class Dedoublonneur:
+    # Les candidats sont bloqués par ville et tranche de prix, puis comparés par
+    # signatures MinHash rangées dans des seaux LSH : on ne compare jamais deux
+    # annonces qui ne partagent pas au moins une bande de signature. Seules les annonces
+    # détectées depuis moins de `fenetre` secondes (la fenêtre des nouveautés) sont candidates :
+    # une annonce remise en ligne longtemps après ouvre un nouveau groupe, et donc une alerte.
+    def __init__(self, permutations: int = 64, bandes: int = 16, seuil: float = 0.6, pas_prix: int = 50, ecart_surface: float = 3,
+                 fenetre: float = 7 * 24 * 3600) -> None:
+        self.bandes = bandes
+        self.lignes = permutations // bandes
+        self.seuil = seuil
+        self.pas_prix = pas_prix
+        self.ecart_surface = ecart_surface
+        self.fenetre = fenetre
+        rng = random.Random(0)
+        self.coefficients = [(rng.randrange(1, PREMIER), rng.randrange(0, PREMIER)) for _ in range(permutations)]
+        self.seaux: dict[tuple, list[tuple[str, str]]] = defaultdict(list)
+        self.annonces: dict[tuple[str, str], tuple] = {}
+        self.groupes: set[str] = set()
+
+    def signature(self, description: str) -> tuple[int, ...]:
+        texte = mots(description)
+        bardeaux = {zlib.crc32(" ".join(texte[i:i + 3]).encode()) for i in range(max(1, len(texte) - 2))}
+        return tuple(min((a * bardeau + b) % PREMIER for bardeau in bardeaux) for a, b in self.coefficients)
+
+    def bloc(self, ville: str, prix) -> tuple:
+        ville = " ".join(mot for mot in mots(ville) if not mot.isdigit()) if ville else None
+        prix = nombre(prix)
+        if not ville or prix is None:
+            return None
+        return ville, int(prix // self.pas_prix)
+
+    def bandes_de(self, signature: tuple) -> list[tuple]:
+        return [(bande, signature[bande * self.lignes:(bande + 1) * self.lignes]) for bande in range(self.bandes)]
+
+    def indexer(self, cle: tuple[str, str], bloc: tuple, signature: tuple, prix, surface, groupe: str, horodatage: float) -> None:
+        self.annonces[cle] = (nombre(prix), nombre(surface), signature, groupe, horodatage)
+        for bande in self.bandes_de(signature):
+            self.seaux[(bloc, *bande)].append(cle)
+
+    def candidats(self, bloc: tuple, signature: tuple) -> set[tuple[str, str]]:
+        ville, tranche = bloc
+        candidats = set()
+        for voisine in (tranche - 1, tranche, tranche + 1):
+            for bande in self.bandes_de(signature):
+                candidats.update(self.seaux.get(((ville, voisine), *bande), ()))
+        return candidats
+
+    def compatibles(self, annonce: Annonce, prix, surface) -> bool:
+        if abs(prix - annonce.prix) > self.pas_prix:
+            return False
+        return surface is None or annonce.surface is None or abs(surface - annonce.surface) <= self.ecart_surface
+
+    def ajouter(self, site: str, annonce: Annonce) -> bool:
+        # Renvoie True si l'annonce ouvre un nouveau groupe, donc mérite une alerte.
+        groupe = f"{site}:{annonce.reference}"
+        horodatage = annonce.horodatage or time.time()
+        bloc = self.bloc(annonce.ville, annonce.prix)
+        if bloc and annonce.description:
+            annonce.signature = self.signature(annonce.description)
+            meilleure = 0
+            for candidat in self.candidats(bloc, annonce.signature):
+                prix, surface, signature, groupe_candidat, detection = self.annonces[candidat]
+                if candidat[0] == site or detection is None or horodatage - detection > self.fenetre:
+                    continue
+                if not self.compatibles(annonce, prix, surface):
+                    continue
+                similarite = sum(x == y for x, y in zip(signature, annonce.signature)) / len(signature)
+                if similarite >= self.seuil and similarite > meilleure:
+                    meilleure, groupe = similarite, groupe_candidat
+            self.indexer((site, annonce.reference), bloc, annonce.signature, annonce.prix, annonce.surface, groupe, horodatage)
+        annonce.groupe = groupe
+        nouveau = groupe not in self.groupes
+        self.groupes.add(groupe)
+        return nouveau
+
+    def charger(self, stockage) -> None:
+        # Les signatures sont persistées : seul l'historique antérieur au dédoublonnage est calculé, une fois.
+        calculees = []
+        for row in stockage.dedoublonnage():
+            groupe = row["groupe"] or f'{row["site"]}:{row["reference"]}'
+            self.groupes.add(groupe)
+            bloc = self.bloc(row["ville"], row["prix"])
+            if not bloc or not row["description"]:
+                continue
+            if row["signature"] is not None:
+                signature = unpack(row["signature"])
+            else:
+                signature = self.signature(row["description"])
+                calculees.append((pack(signature), groupe, row["site"], row["reference"]))
+            self.indexer((row["site"], row["reference"]), bloc, signature, row["prix"], row["surface"], groupe, row["detection"])
+        stockage.maj_dedoublonnage(calculees)
+
+
+def pack(signature: tuple) -> bytes:
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def unpack(donnees: bytes) -> tuple:
+    return struct.unpack(f"<{len(donnees) // 8}Q", donnees)
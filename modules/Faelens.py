@@ -0,0 +1,46 @@
+from modules.Annonce import Annonce, nombre
+from modules.Annonces import Annonces
+
+
+class FaelensAnnonces(Annonces):
+    cache_http = True
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__("Faelens", villes, prix, surface)
+        
+    def budget(self):
+        if self.prix < 500 : return 6
+        if self.prix < 850 : return 7
+        if self.prix < 1000 : return 8
+        return 9
+        
+        
+    def query_url(self) -> str:
+        return f"https://www.faelensimmobilier.com/site/produits.php?tri=&transac=Location&type=Appartement&budget_v=5&budget_l={self.budget()}"
+    
+    selecteur_annonces = ".item"
+    conteneur = ("item",)
+
+    async def aget_raw_response(self) -> dict:
+        _, annonces = await self.aget_page_response(self.query_url())
+        return annonces
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            link = annonce.select_one("a").get("href")
+            ref = annonce.select_one(".ref").text.split(" ")[-1]
+            prix = nombre(annonce.select_one(".prix").select_one(".bold").text.replace("€", ""))
+            if prix > self.prix : continue
+            ville = annonce.select_one(".type").select_one(".semibold").text
+            annonce_obj = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=None,
+                url=f'https://www.faelensimmobilier.com/site/{link}',
+                description=None,
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
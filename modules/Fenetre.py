@@ -0,0 +1,57 @@
+import collections
+import json
+import os
+import time
+
+from modules.Stockage import detection_to_timestamp, timestamp_to_detection
+
+JOUR = 24 * 3600
+
+
+class FenetreNouveautes:
+    # Annonces triées par horodatage de détection : l'expiration ne parcourt que les annonces expirées.
+    def __init__(self, duree: float = 7 * JOUR) -> None:
+        self.duree = duree
+        self.annonces: collections.deque[tuple[float, dict]] = collections.deque()
+
+    def __len__(self) -> int:
+        return len(self.annonces)
+
+    def ajouter(self, annonce: dict, horodatage: float = None) -> None:
+        horodatage = annonce.setdefault("horodatage", horodatage if horodatage is not None else time.time())
+        annonce.setdefault("detection", timestamp_to_detection(horodatage))
+        if not self.annonces or self.annonces[-1][0] <= horodatage:
+            self.annonces.append((horodatage, annonce))
+            return
+        position = len(self.annonces)
+        while position > 0 and self.annonces[position - 1][0] > horodatage:
+            position -= 1
+        self.annonces.insert(position, (horodatage, annonce))
+
+    def expirer(self, maintenant: float = None) -> list[dict]:
+        limite = (maintenant if maintenant is not None else time.time()) - self.duree
+        expirees = []
+        while self.annonces and self.annonces[0][0] < limite:
+            expirees.append(self.annonces.popleft()[1])
+        return expirees
+
+    def liste(self) -> list[dict]:
+        return [annonce for _, annonce in self.annonces]
+
+    @classmethod
+    def charger(cls, new_file: str, duree: float = 7 * JOUR) -> "FenetreNouveautes":
+        fenetre = cls(duree)
+        annonces = json.load(open(new_file, encoding="utf-8")) if os.path.isfile(new_file) else []
+        # Les anciens fichiers n'ont que la chaîne de détection : elle n'est analysée qu'une fois ici.
+        horodatees = [(annonce.get("horodatage") or detection_to_timestamp(annonce["detection"]), annonce) for annonce in annonces]
+        for horodatage, annonce in sorted(horodatees, key=lambda item: item[0]):
+            fenetre.ajouter(annonce, horodatage)
+        return fenetre
+
+    def contenu(self) -> bytes:
+        # Minifié : new.json n'est lu que par le tableau de bord, et chaque octet finit dans l'historique git.
+        return json.dumps(self.liste(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def sauver(self, new_file: str) -> None:
+        with open(new_file, "wb") as f:
+            f.write(self.contenu())
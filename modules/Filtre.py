@@ -0,0 +1,55 @@
+import re
+import unicodedata
+
+MOT = re.compile(r"[a-z0-9]+")
+
+
+def mots(texte: str) -> list[str]:
+    # Casse et accents repliés : "Rez-de-Chaussée" -> ["rez", "de", "chaussee"]
+    texte = unicodedata.normalize("NFKD", texte.casefold()).encode("ascii", "ignore").decode("ascii")
+    return MOT.findall(texte)
+
+
+class FiltreRedibitoire:
+    # Un terme correspond à des mots entiers, casse et accents repliés : "rdc" n'écarte pas "Nordcap".
+    # Suivi de "*", son dernier mot est un préfixe : "coloc*" écarte aussi "colocation",
+    # "colocataires" ou "Colocations acceptées".
+    # Les termes sont indexés par leur premier mot (ou leur préfixe s'ils n'ont qu'un mot) :
+    # chaque mot de la description coûte quelques recherches dans un dict, quel que soit le nombre de termes.
+    def __init__(self, termes: list[str]) -> None:
+        self.termes = list(termes)
+        self.index: dict[str, list[tuple[tuple[str, ...], bool]]] = {}
+        self.prefixes: dict[str, list[tuple[tuple[str, ...], bool]]] = {}
+        for terme in self.termes:
+            prefixe = terme.rstrip().endswith("*")
+            sequence = tuple(mots(terme))
+            if not sequence:
+                continue
+            index = self.prefixes if prefixe and len(sequence) == 1 else self.index
+            index.setdefault(sequence[0], []).append((sequence, prefixe))
+        self.longueurs = sorted({len(debut) for debut in self.prefixes})
+
+    def termes_de(self, mot: str):
+        yield from self.index.get(mot, ())
+        for longueur in self.longueurs:
+            yield from self.prefixes.get(mot[:longueur], ())
+
+    def correspondance(self, description: str) -> str:
+        if not description:
+            return None
+        texte = mots(description)
+        # Le cas courant, aucun terme présent, se décide par intersections d'ensembles.
+        if self.index.keys().isdisjoint(texte) and all(self.prefixes.keys().isdisjoint({mot[:longueur] for mot in texte})
+                                                       for longueur in self.longueurs):
+            return None
+        for i, mot in enumerate(texte):
+            for sequence, prefixe in self.termes_de(mot):
+                suite = texte[i:i + len(sequence)]
+                if len(suite) < len(sequence) or tuple(suite[:-1]) != sequence[:-1]:
+                    continue
+                if suite[-1].startswith(sequence[-1]) if prefixe else suite[-1] == sequence[-1]:
+                    return " ".join(sequence)
+        return None
+
+    def __call__(self, description: str) -> bool:
+        return self.correspondance(description) is not None
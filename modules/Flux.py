@@ -0,0 +1,48 @@
+import json
+import os
+
+
+class FluxNouveautes:
+    # Journal en ajout seul pour le tableau de bord : chaque publication produit un petit
+    # fichier numéroté (annonces ajoutées, urls retirées) et le manifeste donne le dernier
+    # numéro. Un client déjà à jour ne télécharge que le manifeste.
+    def __init__(self, dossier: str, conserver: int = 500) -> None:
+        self.dossier = dossier
+        self.conserver = conserver
+        self.manifest_file = os.path.join(dossier, "manifest.json")
+        manifest = json.load(open(self.manifest_file, encoding="utf-8")) if os.path.isfile(self.manifest_file) else {}
+        self.sequence = manifest.get("sequence", 0)
+        self.premier = manifest.get("premier", 1)
+        self.publiees: dict[str, dict] = None
+
+    def chunk_file(self, sequence: int) -> str:
+        return os.path.join(self.dossier, f"{sequence:08d}.json")
+
+    def initialiser(self, annonces: list[dict]) -> None:
+        # État déjà publié au démarrage (new.json), base des différences suivantes.
+        self.publiees = {annonce["url"]: annonce for annonce in annonces}
+
+    def mettre_a_jour(self, annonces: list[dict]) -> tuple[list[tuple[str, bytes]], list[str]]:
+        # Renvoie les fichiers à écrire et ceux à supprimer, rien si la fenêtre n'a pas bougé.
+        courantes = {annonce["url"]: annonce for annonce in annonces}
+        if self.publiees is None:
+            self.publiees = courantes
+        ajouts = [annonce for url, annonce in courantes.items() if url not in self.publiees]
+        retraits = [url for url in self.publiees if url not in courantes]
+        self.publiees = courantes
+        if not ajouts and not retraits:
+            return [], []
+
+        self.sequence += 1
+        chunk = {"sequence": self.sequence, "ajouts": ajouts, "retraits": retraits}
+        ecrits = [(self.chunk_file(self.sequence), minifier(chunk))]
+        supprimes = []
+        while self.sequence - self.premier + 1 > self.conserver:
+            supprimes.append(self.chunk_file(self.premier))
+            self.premier += 1
+        ecrits.append((self.manifest_file, minifier({"sequence": self.sequence, "premier": self.premier})))
+        return ecrits, supprimes
+
+
+def minifier(donnees) -> bytes:
+    return json.dumps(donnees, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,58 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class FonciaAnnonces(Annonces):
+    slugs = {
+        'lille': 'lille-59',
+        'la madeleine': 'la-madeleine-59110'
+    }
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Foncia', villes, prix, surface)
+
+    def query_url(self) -> str:
+        return "https://fnc-api.prod.fonciatech.net/annonces/annonces/search"
+
+    def request_body(self) -> dict:
+        slugs = self.get_slugs_villes()
+        return {
+            "type": "location",
+            "filters": {
+                "localities": {
+                    "slugs": slugs
+                },
+                "surface": {
+                    "min": self.surface
+                },
+                "prix": {
+                    "max": self.prix
+                }
+            },
+            "expandNearby": False,
+            "size": 100
+        }
+
+    async def aget_raw_response(self) -> dict:
+        resp = await self.apost_api_response(self.query_url())
+        return resp
+
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response["annonces"]:
+            description = annonce["description"]
+            if self.is_redibitoire(description):
+                continue
+            images = annonce["medias"] if "medias" in annonce else []
+            annonce_obj: Annonce = Annonce(
+                reference=annonce["reference"],
+                ville=annonce["localisation"]["locality"]["libelle"],
+                prix=annonce["loyer"],
+                surface=annonce["surface"]["totale"],
+                url=f'https://fr.foncia.com{annonce["canonicalUrl"]}',
+                description=description,
+                images=images,
+                publication=annonce["datePublication"],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
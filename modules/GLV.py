@@ -0,0 +1,18 @@
+from modules.Catalogue import CATALOGUE_URL, CatalogueAnnonces, Champ, SpecCatalogue
+
+
+class GLVAnnonces(CatalogueAnnonces):
+    spec = SpecCatalogue(
+        nom="GLV Immobilier",
+        domaine="https://www.glv-immobilier.fr",
+        url="https://www.glv-immobilier.fr" + CATALOGUE_URL.format(search_id="1775915508437856"),
+        conteneur=".item-card",
+        champs={
+            "url": Champ("a", "lien", rang=1),
+            "description": Champ(".products-description"),
+            "reference": Champ(".products-ref", "apres_deux_points"),
+            "prix": Champ(".price-bold", "montant"),
+            "ville": Champ(".products-city"),
+        },
+        slugs={"lille": "59000 LILLE", "la madeleine": "59110 LA-MADELEINE"},
+    )
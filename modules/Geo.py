@@ -0,0 +1,176 @@
+import math
+import re
+
+from modules.Filtre import mots
+
+RAYON_TERRE = 6371.0
+KM_PAR_DEGRE = 111.32
+
+# Centroïdes des communes de la métropole lilloise couvertes par les agences
+# (noms des tables `slugs` des adaptateurs et communes voisines), avec leurs codes postaux.
+COMMUNES = [
+    ("Lille", (50.6292, 3.0573), ["59000", "59800", "59777"], []),
+    ("La Madeleine", (50.6546, 3.0710), ["59110"], []),
+    ("Lomme", (50.6436, 2.9878), ["59160"], []),
+    ("Hellemmes", (50.6261, 3.1100), ["59260"], ["hellemmes lille"]),
+    ("Lambersart", (50.6500, 3.0250), ["59130"], []),
+    ("Marcq-en-Barœul", (50.6711, 3.0972), ["59700"], ["marcq en baroeul", "marcq"]),
+    ("Mons-en-Barœul", (50.6406, 3.1094), ["59370"], ["mons en baroeul"]),
+    ("Saint-André-lez-Lille", (50.6558, 3.0464), ["59350"], ["saint andre", "st andre lez lille", "st andre"]),
+    ("Marquette-lez-Lille", (50.6769, 3.0664), ["59520"], ["marquette"]),
+    ("Wambrechies", (50.6858, 3.0483), ["59118"], []),
+    ("Villeneuve-d'Ascq", (50.6233, 3.1450), ["59650", "59491"], ["villeneuve d ascq", "villeneuve dascq"]),
+    ("Lezennes", (50.6150, 3.1150), [], []),
+    ("Ronchin", (50.6036, 3.0894), ["59790"], []),
+    ("Faches-Thumesnil", (50.5889, 3.0736), ["59155"], []),
+    ("Loos", (50.6128, 3.0197), ["59120"], []),
+    ("Haubourdin", (50.6086, 2.9869), ["59320"], []),
+    ("Croix", (50.6781, 3.1494), ["59170"], []),
+    ("Wasquehal", (50.6703, 3.1308), ["59290"], []),
+    ("Hem", (50.6553, 3.1886), ["59510"], []),
+    ("Roubaix", (50.6942, 3.1746), ["59100"], []),
+    ("Tourcoing", (50.7239, 3.1612), ["59200"], []),
+    ("Wattrelos", (50.7017, 3.2150), ["59150"], []),
+    ("Seclin", (50.5486, 3.0289), ["59113"], []),
+    ("Armentières", (50.6881, 2.8811), ["59280"], []),
+]
+
+CODE_POSTAL = re.compile(r"\b(\d{5})\b")
+
+CENTRES: dict[str, tuple[float, float]] = {}
+NOMS: dict[str, str] = {}
+POSTAUX: dict[str, str] = {}
+for nom, centre, codes, alias in COMMUNES:
+    CENTRES[nom] = centre
+    for variante in [nom, *alias]:
+        NOMS[" ".join(mots(variante))] = nom
+    for code in codes:
+        POSTAUX[code] = nom
+
+
+def commune(ville: str) -> str:
+    # Code postal d'abord ("59110 LA-MADELEINE", "Lille (59000)"), puis le plus long préfixe
+    # de mots connu ("Lille Vauban" -> Lille). None si la commune n'est pas dans la table.
+    if not ville:
+        return None
+    for code in CODE_POSTAL.findall(ville):
+        if code in POSTAUX:
+            return POSTAUX[code]
+    texte = [mot for mot in mots(ville) if not mot.isdigit()]
+    for fin in range(len(texte), 0, -1):
+        nom = NOMS.get(" ".join(texte[:fin]))
+        if nom:
+            return nom
+    return None
+
+
+def localiser(ville: str) -> tuple[float, float]:
+    nom = commune(ville)
+    return CENTRES[nom] if nom else None
+
+
+def coordonnees(valeur) -> tuple[float, float]:
+    # Les sites renvoient parfois des chaînes, ou (0, 0) faute de position.
+    try:
+        lat, lon = (float(composante) for composante in valeur)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None
+    return lat, lon
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAYON_TERRE * math.asin(math.sqrt(a))
+
+
+class GrilleGeo:
+    # Grille uniforme de cellules d'environ `pas` km : une recherche ne visite que les
+    # cellules qui recoupent la zone demandée, quelle que soit la taille de l'historique.
+    def __init__(self, pas: float = 1.0, latitude_reference: float = 50.63) -> None:
+        self.dlat = pas / KM_PAR_DEGRE
+        self.dlon = pas / (KM_PAR_DEGRE * math.cos(math.radians(latitude_reference)))
+        self.cellules: dict[tuple[int, int], dict[int, tuple[float, float]]] = {}
+        self.points: dict[int, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def cellule(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.dlat), math.floor(lon / self.dlon)
+
+    def ajouter(self, position: int, lat: float, lon: float) -> None:
+        if position in self.points:
+            self.retirer(position)
+        self.points[position] = (lat, lon)
+        self.cellules.setdefault(self.cellule(lat, lon), {})[position] = (lat, lon)
+
+    def retirer(self, position: int) -> None:
+        point = self.points.pop(position, None)
+        if point:
+            self.cellules[self.cellule(*point)].pop(position, None)
+
+    def parcourir(self, sud: float, ouest: float, nord: float, est: float):
+        (i1, j1), (i2, j2) = self.cellule(sud, ouest), self.cellule(nord, est)
+        for i in range(i1, i2 + 1):
+            for j in range(j1, j2 + 1):
+                yield from self.cellules.get((i, j), {}).items()
+
+    def compter(self, sud: float, ouest: float, nord: float, est: float) -> int:
+        # Majorant du nombre de points de la zone, sans toucher aux points eux-mêmes.
+        (i1, j1), (i2, j2) = self.cellule(sud, ouest), self.cellule(nord, est)
+        return sum(len(self.cellules.get((i, j), ())) for i in range(i1, i2 + 1) for j in range(j1, j2 + 1))
+
+    def contient(self, position: int, sud: float, ouest: float, nord: float, est: float) -> bool:
+        point = self.points.get(position)
+        return point is not None and sud <= point[0] <= nord and ouest <= point[1] <= est
+
+    def rectangle(self, sud: float, ouest: float, nord: float, est: float) -> set[int]:
+        return {position for position, (lat, lon) in self.parcourir(sud, ouest, nord, est)
+                if sud <= lat <= nord and ouest <= lon <= est}
+
+    def englobant(self, lat: float, lon: float, km: float) -> tuple[float, float, float, float]:
+        dlat = km / KM_PAR_DEGRE
+        dlon = km / (KM_PAR_DEGRE * max(math.cos(math.radians(lat)), 1e-6))
+        return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+    def distances(self, lat: float, lon: float):
+        # Distance d'une position au centre (inf sans point). Les annonces placées au centre
+        # de leur commune partagent le même point : une seule distance à calculer pour toutes.
+        calculees: dict[tuple[float, float], float] = {}
+
+        def distance_a(position: int) -> float:
+            point = self.points.get(position)
+            if point is None:
+                return math.inf
+            d = calculees.get(point)
+            if d is None:
+                d = calculees[point] = distance(lat, lon, *point)
+            return d
+        return distance_a
+
+    def rayon(self, lat: float, lon: float, km: float) -> set[int]:
+        # Positions à moins de `km` du centre. Une cellule entièrement dans le cercle est
+        # prise d'un bloc, une cellule entièrement dehors est ignorée : seules les cellules
+        # du bord demandent une distance par point.
+        distance_a = self.distances(lat, lon)
+        sud, ouest, nord, est = self.englobant(lat, lon, km)
+        (i1, j1), (i2, j2) = self.cellule(sud, ouest), self.cellule(nord, est)
+        resultats = set()
+        for i in range(i1, i2 + 1):
+            s, n = i * self.dlat, (i + 1) * self.dlat
+            for j in range(j1, j2 + 1):
+                points = self.cellules.get((i, j))
+                if not points:
+                    continue
+                w, e = j * self.dlon, (j + 1) * self.dlon
+                if distance(lat, lon, min(max(lat, s), n), min(max(lon, w), e)) > km:
+                    continue
+                if max(distance(lat, lon, a, b) for a in (s, n) for b in (w, e)) <= km:
+                    resultats.update(points)
+                else:
+                    resultats.update(position for position in points if distance_a(position) <= km)
+        return resultats
@@ -0,0 +1,27 @@
+from modules.Annonces import Annonces
+
+
+class ImmoDeFranceAnnonces(Annonces):
+    slugs = {
+        'lille': 24453,
+        'la madeleine': 24471
+    }
+    
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Immo de France', villes, prix, surface)
+        
+    def query_url(self, page) -> str:
+        return "https://www.immodefrance.com/fr/locations"
+    
+    def request_body(self, ville) -> dict:
+        slug = self.slugs[ville.lower()]
+        return {
+            "location_search[commune]": slug,
+            "location_search[rayonCommune]": 0,
+            "location_search[typeBien][]": 1,
+            "location_search[surface_min]": self.surface,
+            "location_search[loyer_max]": self.prix
+        }
+        
+    async def aget_raw_response(self) -> dict:
+        response = []
@@ -0,0 +1,57 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+import asyncio
+
+
+class LedouxAnnonces(Annonces):
+    slugs = {
+        'lille': 59350,
+        'la madeleine': 59368
+    }
+    
+    
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Cabinet Ledoux', villes, prix, surface)   
+        
+
+    def query_url(self, page) -> str:
+        insee = "&".join([f"insee[]={slug}" for slug in self.get_slugs_villes()])
+        
+        return f"https://www.ledoux.fr/fr/data_listing_formrecherche.html?{insee}&prixmax={self.prix}&surfacemin={self.surface}?page={page}"
+    
+    async def aget_page(self, page: int) -> dict:
+        page_resp = await self.aget_api_response(self.query_url(page))
+        return page_resp["data"]["resultats"]
+
+    async def aget_raw_response(self) -> dict:
+        resultats = await self.aget_page(1)
+        response = resultats["data"]
+        for page_resultats in await asyncio.gather(*(self.aget_page(page) for page in range(2, resultats["last_page"] + 1))):
+            response += page_resultats["data"]
+        return response
+
+    async def aiter_pages(self, old_annonces: dict):
+        # Chaque page est formatée dès son arrivée, sans attendre les suivantes.
+        resultats = await self.aget_page(1)
+        yield await self.aformater(resultats["data"])
+        for page in asyncio.as_completed([self.aget_page(page) for page in range(2, resultats["last_page"] + 1)]):
+            yield await self.aformater((await page)["data"])
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            description = annonce["descriptif"]
+            if self.is_redibitoire(description):
+                continue
+            url = f'{annonce["type"]}-{annonce["loc"]}-{annonce["ville"]}-{annonce["cpdep"]}-{annonce["idhabit"]}.html'.replace(" ","-")
+            annonce_obj: Annonce = Annonce(
+                reference=str(annonce["idhabit"]),
+                ville = annonce["ville"],
+                prix=annonce["prix"],
+                surface=annonce["surface"],
+                url=f'https://www.ledoux.fr/{url}',
+                description=description,
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
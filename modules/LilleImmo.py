@@ -0,0 +1,46 @@
+from modules.Annonce import Annonce, nombre
+from modules.Annonces import Annonces
+
+
+class LilleImmoAnnonces(Annonces):
+    villes_interrogees = ["Lille"]
+    cache_http = True
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Lille Immo', villes, prix, surface)
+        
+    def query_url(self) -> str:
+        return f"https://www.lille-immo.fr/produits.php?ff=hab&transaction_hab=L&type_hab[]=A&type_hab[]=S&type_hab[]=T1&type_hab[]=T2&type_hab[]=T3&type_hab[]=T4&type_hab[]=T5&type_hab[]=D&ville_hab=LILLE&min_price_loc_hab=0&max_price_loc_hab={self.prix}"
+    
+    selecteur_annonces = ".annonce"
+    conteneur = ("annonce",)
+
+    async def aget_raw_response(self) -> dict:
+        _, annonces = await self.aget_page_response(self.query_url())
+        return annonces
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            description = annonce.find("div", class_="desc_hover_wrap").text
+            if self.is_redibitoire(description):
+                continue
+            url = annonce.select_one("a.cursor").get("href")
+            ref = annonce.get("id")
+            prix = annonce.find("p", class_="price").text.split(" ")[0]
+            surface = nombre(annonce.select_one('ul li').text.split("m²")[0].split(" ")[-1])
+            if surface < self.surface:
+                continue
+            ville = annonce.select_one(".desc h2 strong").text.split("à")[1].strip()
+            images = []
+            annonce_obj: Annonce = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=surface,
+                url=url,
+                description=description,
+                images=images,
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
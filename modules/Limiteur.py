@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+
+class LimiteurHotes:
+    # Les sémaphores asyncio sont liés à une boucle : on en garde un jeu par boucle.
+    def __init__(self) -> None:
+        self.semaphores = weakref.WeakKeyDictionary()
+
+    def hote(self, url: str, limite: int) -> asyncio.Semaphore:
+        par_hote = self.semaphores.setdefault(asyncio.get_running_loop(), {})
+        hote = urlsplit(url).netloc
+        if hote not in par_hote:
+            par_hote[hote] = asyncio.Semaphore(limite)
+        return par_hote[hote]
+
+
+class SeauJetons:
+    # Partagé par tous les threads qui interrogent un hôte : `debit` requêtes par seconde en
+    # moyenne, `rafale` d'affilée au plus. Les jetons peuvent devenir négatifs : chaque appelant
+    # réserve sa place et attend son tour hors du verrou.
+    def __init__(self, debit: float, rafale: int, minimum: float = 0.2) -> None:
+        self.debit = debit
+        self.debit_max = debit
+        self.rafale = rafale
+        self.minimum = minimum
+        self.jetons = float(rafale)
+        self.dernier = time.monotonic()
+        self.verrou = threading.Lock()
+
+    def reserver(self) -> float:
+        with self.verrou:
+            maintenant = time.monotonic()
+            self.jetons = min(self.rafale, self.jetons + (maintenant - self.dernier) * self.debit)
+            self.dernier = maintenant
+            self.jetons -= 1
+            return -self.jetons / self.debit if self.jetons < 0 else 0.0
+
+    def prendre(self) -> float:
+        attente = self.reserver()
+        if attente:
+            time.sleep(attente)
+        return attente
+
+    def ralentir(self) -> None:
+        # L'hôte répond 429 : le débit est divisé par deux, puis regagne 5 % par réponse normale.
+        with self.verrou:
+            self.debit = max(self.debit / 2, self.minimum)
+
+    def accelerer(self) -> None:
+        with self.verrou:
+            self.debit = min(self.debit * 1.05, self.debit_max)
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BORNES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+DESCRIPTIONS = {
+    "annonces_duree_secondes": ("histogram", "Durée par site et par étape (fetch, parse, format, dedup, persist)"),
+    "annonces_requetes_total": ("counter", "Requêtes HTTP envoyées"),
+    "annonces_octets_total": ("counter", "Octets téléchargés"),
+    "annonces_vues_total": ("counter", "Annonces retenues après formatage"),
+    "annonces_nouvelles_total": ("counter", "Annonces absentes de l'historique"),
+    "annonces_filtrees_total": ("counter", "Annonces écartées par les termes rédhibitoires"),
+    "annonces_erreurs_total": ("counter", "Passages en échec, par type d'exception"),
+}
+
+
+class Histogramme:
+    def __init__(self, bornes: tuple = BORNES) -> None:
+        self.bornes = bornes
+        # Un seau par borne plus le débordement (+Inf), cumulés seulement à l'export.
+        self.seaux = [0] * (len(bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+
+    def observer(self, valeur: float) -> None:
+        self.seaux[bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+        self.nombre += 1
+
+    def cumules(self) -> list[tuple[str, int]]:
+        total = 0
+        cumules = []
+        for borne, nombre in zip([*map(str, self.bornes), "+Inf"], self.seaux):
+            total += nombre
+            cumules.append((borne, total))
+        return cumules
+
+
+class Metriques:
+    def __init__(self) -> None:
+        self.verrou = threading.Lock()
+        self.compteurs: dict[tuple, float] = {}
+        self.histogrammes: dict[tuple, Histogramme] = {}
+
+    def incrementer(self, nom: str, valeur: float = 1, **labels) -> None:
+        cle = (nom, tuple(sorted(labels.items())))
+        with self.verrou:
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + valeur
+
+    def observer(self, nom: str, valeur: float, **labels) -> None:
+        cle = (nom, tuple(sorted(labels.items())))
+        with self.verrou:
+            if cle not in self.histogrammes:
+                self.histogrammes[cle] = Histogramme()
+            self.histogrammes[cle].observer(valeur)
+
+    def duree(self, site: str, etape: str, valeur: float) -> None:
+        self.observer("annonces_duree_secondes", valeur, site=site, etape=etape)
+
+    @contextmanager
+    def chrono(self, site: str, etape: str):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.duree(site, etape, time.perf_counter() - debut)
+
+    def exposition(self) -> str:
+        # Format texte Prometheus 0.0.4
+        lignes = []
+        with self.verrou:
+            series = sorted([*self.compteurs.items(), *self.histogrammes.items()], key=lambda item: item[0])
+        nom_courant = None
+        for (nom, labels), valeur in series:
+            if nom != nom_courant:
+                type_, aide = DESCRIPTIONS.get(nom, ("untyped", nom))
+                lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} {type_}"]
+                nom_courant = nom
+            if isinstance(valeur, Histogramme):
+                for borne, nombre in valeur.cumules():
+                    lignes.append(f"{nom}_bucket{format_labels(labels + (('le', borne),))} {nombre}")
+                lignes.append(f"{nom}_sum{format_labels(labels)} {valeur.somme}")
+                lignes.append(f"{nom}_count{format_labels(labels)} {valeur.nombre}")
+            else:
+                lignes.append(f"{nom}{format_labels(labels)} {valeur}")
+        return "\n".join(lignes) + "\n"
+
+    def instantane(self) -> dict:
+        with self.verrou:
+            compteurs = [{"nom": nom, "labels": dict(labels), "valeur": valeur} for (nom, labels), valeur in self.compteurs.items()]
+            histogrammes = [{"nom": nom, "labels": dict(labels), "somme": h.somme, "nombre": h.nombre, "seaux": dict(h.cumules())}
+                            for (nom, labels), h in self.histogrammes.items()]
+        return {"horodatage": time.time(), "compteurs": compteurs, "histogrammes": histogrammes}
+
+    def sauver(self, fichier: str) -> None:
+        os.makedirs(os.path.dirname(fichier), exist_ok=True)
+        tmp = f"{fichier}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.instantane(), f, indent=1)
+        os.replace(tmp, fichier)
+
+    def servir(self, port: int = 9464, hote: str = "127.0.0.1") -> ThreadingHTTPServer:
+        metriques = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                corps = metriques.exposition().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        serveur = ThreadingHTTPServer((hote, port), Handler)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        return serveur
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    echappe = lambda valeur: str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{cle}="{echappe(valeur)}"' for cle, valeur in labels) + "}"
+
+
+metriques = Metriques()
@@ -0,0 +1,42 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class NexityAnnonces(Annonces):
+    villes_interrogees = ["Lille", "La Madeleine"]
+    cache_http = True
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Nexity', villes, prix, surface)
+        
+    def query_url(self) -> str:
+        return f"https://www.nexity.fr/annonces-immobilieres/location/immobilier/tout/france?budget_max={self.prix}&locationsId%5B0%5D=29397&locationsId%5B1%5D=29399&surface_min={self.surface}&types_bien%5B0%5D=appartement"
+
+    selecteur_annonces = ".product"
+    conteneur = ("product",)
+
+    async def aget_raw_response(self) -> dict:
+        _, annonces = await self.aget_page_response(self.query_url())
+        return annonces
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            link = annonce.select_one("a").get("href")
+            ref = link.split("/")[-1]
+            card = annonce.select_one(".product-card-content")
+            if not card : continue
+            prix = card.select_one(".pricing").text.split("€")[0].strip()
+            ville = annonce.select_one(".location").text.split(" ")[0]
+            surface = annonce.select_one(".details").text.split(" | ")[-1].split("m")[0]
+            annonce_obj = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=surface,
+                url=f'https://www.nexity.fr{link}',
+                description="",
+                images=[],
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
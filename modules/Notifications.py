@@ -0,0 +1,40 @@
+import sys
+
+# Alertes à l'arrivée de nouvelles annonces. Chaque backend importe ce dont il a besoin
+# à sa création : winsound n'existe que sous Windows.
+
+
+def aucune() -> callable:
+    return lambda nombre: None
+
+
+def terminal() -> callable:
+    def alerter(nombre: int) -> None:
+        sys.stdout.write("\a" * min(nombre, 5))
+        sys.stdout.flush()
+    return alerter
+
+
+def bip() -> callable:
+    import winsound
+
+    def alerter(nombre: int) -> None:
+        [winsound.Beep(300, 250) for i in range(min(nombre, 5))]
+    return alerter
+
+
+NOTIFICATIONS = {
+    "aucune": aucune,
+    "terminal": terminal,
+    "bip": bip,
+}
+
+
+def par_defaut() -> str:
+    return "bip" if sys.platform == "win32" else "terminal"
+
+
+def notificateur(nom: str = None) -> callable:
+    if nom is not None and nom not in NOTIFICATIONS:
+        raise ValueError(f"notification inconnue : {nom} ({', '.join(NOTIFICATIONS)})")
+    return NOTIFICATIONS[nom or par_defaut()]()
@@ -0,0 +1,36 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+
+
+class OrpiAnnonces(Annonces):
+    villes_interrogees = ["Lille", "La Madeleine"]
+    tri_recent = True
+
+    def  __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Orpi', villes, prix, surface)
+        
+    def query_url(self) -> str:
+        return f'https://www.orpi.com/recherche/ajax/rent?realEstateTypes[]=appartement&locations[0][value]=lille&locations[0][label]=Lille (59000)&locations[1][value]=la-madeleine&locations[1][label]=La Madeleine (59110)&minSurface={self.surface}&maxPrice={self.prix}&sort=date-down&layoutType=mixte&recentlySold=false'
+    
+    async def aget_raw_response(self) -> dict:
+        return await self.aget_api_response(self.query_url())
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response["items"]:
+            description = annonce["longAd"]
+            if self.is_redibitoire(description):
+                continue
+
+            annonce_obj: Annonce = Annonce(
+                reference=annonce['reference'],
+                ville=annonce['location'],
+                prix=annonce['price'],
+                surface=annonce['surface'],
+                url=f'https://www.orpi.com/annonce-location-{annonce["slug"]}',
+                description=description,
+                images=annonce['images'],
+                coordonnees=(annonce['latitude'], annonce['longitude']),
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
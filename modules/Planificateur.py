@@ -0,0 +1,103 @@
+import asyncio
+import heapq
+import time
+import traceback
+
+from modules.Disjoncteur import Disjoncteurs
+from modules.Metriques import metriques
+
+
+class Rythme:
+    # L'intervalle vise `cible` nouvelles annonces par passage d'après le débit
+    # observé (moyenne exponentielle), borné par [minimum, maximum].
+    def __init__(self, intervalle: float = 15 * 60, minimum: float = 5 * 60, maximum: float = 60 * 60, cible: float = 1.0,
+                 lissage: float = 0.3, backoff: float = 2.0, maximum_backoff: float = 6 * 3600) -> None:
+        self.intervalle = intervalle
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cible = cible
+        self.lissage = lissage
+        self.backoff = backoff
+        self.maximum_backoff = maximum_backoff
+        self.taux: float = None
+        self.erreurs = 0
+        self.dernier: float = None
+
+    def succes(self, nouvelles: int) -> float:
+        maintenant = time.time()
+        duree = maintenant - self.dernier if self.dernier else self.intervalle
+        self.dernier = maintenant
+        taux = nouvelles / max(duree, 1)
+        self.taux = taux if self.taux is None else self.lissage * taux + (1 - self.lissage) * self.taux
+        self.erreurs = 0
+        intervalle = self.cible / self.taux if self.taux else self.maximum
+        self.intervalle = min(max(intervalle, self.minimum), self.maximum)
+        return self.intervalle
+
+    def echec(self) -> float:
+        self.erreurs += 1
+        return min(self.intervalle * self.backoff ** self.erreurs, self.maximum_backoff)
+
+
+class Planificateur:
+    def __init__(self, rythmes: dict[str, Rythme], disjoncteurs: Disjoncteurs = None) -> None:
+        self.rythmes = rythmes
+        self.disjoncteurs = disjoncteurs or Disjoncteurs()
+        maintenant = time.time()
+        # Un site coupé avant l'arrêt du programme ne repart qu'à son passage d'essai.
+        self.file = [(maintenant + self.disjoncteurs.attente(site), site) for site in rythmes]
+        heapq.heapify(self.file)
+        self.changement: asyncio.Event = None
+
+    def planifier(self, site: str, delai: float) -> None:
+        heapq.heappush(self.file, (time.time() + delai, site))
+        if self.changement:
+            self.changement.set()
+
+    async def lancer(self, site: str, tache) -> None:
+        attente = self.disjoncteurs.attente(site)
+        if attente:
+            self.planifier(site, attente)
+            return
+        rythme = self.rythmes[site]
+        try:
+            nouvelles = await tache(site)
+        except Exception as e:
+            # Les échecs du site sont déjà gérés par la tâche (None) : une exception ici vient
+            # du traitement local (base, dédoublonnage, publication) et ne doit pas couper le site.
+            metriques.incrementer("annonces_erreurs_locales_total", site=site, type=type(e).__name__)
+            print('\t', f'{site} : erreur locale après la récupération')
+            traceback.print_exc()
+            self.planifier(site, rythme.intervalle)
+            return
+        if nouvelles is not None:
+            self.disjoncteurs.succes(site)
+            self.planifier(site, rythme.succes(nouvelles))
+            return
+        delai = rythme.echec()
+        if self.disjoncteurs.echec(site):
+            delai = self.disjoncteurs.attente(site)
+            metriques.incrementer("annonces_disjonctions_total", site=site)
+            print('\t', f'{site} : {self.disjoncteurs[site].echecs} échecs consécutifs, site coupé pendant {delai / 60:.0f} min')
+        self.planifier(site, delai)
+
+    async def executer(self, tache) -> None:
+        # `tache(site)` renvoie le nombre de nouvelles annonces, ou None si le site a échoué.
+        # Chaque site repart dès qu'il est dû, sans attendre les autres.
+        self.changement = asyncio.Event()
+        en_cours = set()
+        while True:
+            while self.file and self.file[0][0] <= time.time():
+                _, site = heapq.heappop(self.file)
+                execution = asyncio.create_task(self.lancer(site, tache))
+                en_cours.add(execution)
+                execution.add_done_callback(en_cours.discard)
+            self.changement.clear()
+            delai = max(self.file[0][0] - time.time(), 0) if self.file else None
+            try:
+                await asyncio.wait_for(self.changement.wait(), delai)
+            except asyncio.TimeoutError:
+                pass
+
+    def prochain(self, site: str) -> float:
+        return min((quand for quand, autre in self.file if autre == site), default=None)
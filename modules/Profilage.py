@@ -0,0 +1,121 @@
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Echantillonneur(threading.Thread):
+    # cProfile ne voit que le thread qui l'active : les threads du pool sont
+    # couverts en relevant périodiquement toutes les piles via sys._current_frames.
+    def __init__(self, intervalle: float = 0.005) -> None:
+        super().__init__(daemon=True, name="echantillonneur")
+        self.intervalle = intervalle
+        self.piles: Counter = Counter()
+        self.arret = threading.Event()
+
+    def run(self) -> None:
+        noms = {}
+        while not self.arret.wait(self.intervalle):
+            if len(noms) != threading.active_count():
+                noms = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                pile = []
+                while frame is not None:
+                    pile.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                    frame = frame.f_back
+                pile.append(noms.get(ident, str(ident)))
+                self.piles[";".join(reversed(pile))] += 1
+
+    def arreter(self) -> None:
+        self.arret.set()
+        self.join()
+
+    def sauver(self, fichier: str) -> None:
+        # Format "piles repliées" lu par flamegraph.pl, speedscope, inferno...
+        with open(fichier, "w", encoding="utf-8") as f:
+            for pile, nombre in self.piles.most_common():
+                f.write(f"{pile} {nombre}\n")
+
+
+class Profileur:
+    # Chaque frame de pile conservée par tracemalloc multiplie le coût des allocations
+    # (x10 dès 8 frames sur Sergic) : par défaut seule la ligne allouante est gardée et
+    # l'imputation fine par adaptateur passe par une session par site.
+    def __init__(self, dossier: str, conserver: int = 10, intervalle: float = 0.005, top: int = 25, profondeur: int = 1) -> None:
+        self.dossier = dossier
+        self.conserver = conserver
+        self.intervalle = intervalle
+        self.top = top
+        self.profondeur = profondeur
+
+    def rotation(self) -> None:
+        profils = sorted(nom for nom in os.listdir(self.dossier) if os.path.isdir(os.path.join(self.dossier, nom)))
+        for nom in profils[:max(len(profils) - self.conserver, 0)]:
+            shutil.rmtree(os.path.join(self.dossier, nom), ignore_errors=True)
+
+    @contextmanager
+    def session(self, nom: str, adaptateurs: list = ()):
+        dossier = os.path.join(self.dossier, f'{time.strftime("%Y%m%d-%H%M%S")}-{nom}'.replace(" ", "_"))
+        os.makedirs(dossier, exist_ok=True)
+        tracemalloc.start(self.profondeur)
+        echantillonneur = Echantillonneur(self.intervalle)
+        echantillonneur.start()
+        profil = cProfile.Profile()
+        debut = time.perf_counter()
+        profil.enable()
+        try:
+            yield dossier
+        finally:
+            profil.disable()
+            duree = time.perf_counter() - debut
+            echantillonneur.arreter()
+            snapshot = tracemalloc.take_snapshot()
+            pic = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            profil.dump_stats(os.path.join(dossier, "profil.pstats"))
+            texte = io.StringIO()
+            pstats.Stats(profil, stream=texte).sort_stats("cumulative").print_stats(self.top * 2)
+            with open(os.path.join(dossier, "profil.txt"), "w", encoding="utf-8") as f:
+                f.write(texte.getvalue())
+            echantillonneur.sauver(os.path.join(dossier, "piles.folded"))
+            with open(os.path.join(dossier, "memoire.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Pic de mémoire tracée : {pic / 1024:.1f} Kio\n\n")
+                f.write(self.rapport_memoire(snapshot, adaptateurs))
+            print(f"Profil {nom} : {duree:.2f}s, écrit dans {dossier}")
+            self.rotation()
+
+    def rapport_memoire(self, snapshot: tracemalloc.Snapshot, adaptateurs: list) -> str:
+        # Une allocation est imputée à l'adaptateur dont le code est le plus proche dans sa pile.
+        plages = []
+        for classe in adaptateurs:
+            try:
+                lignes, debut = inspect.getsourcelines(classe)
+            except (OSError, TypeError):
+                continue
+            plages.append((inspect.getsourcefile(classe), debut, debut + len(lignes), classe.__name__))
+        par_adaptateur = {}
+        for trace in snapshot.traces:
+            for frame in reversed(trace.traceback):
+                adaptateur = next((nom for fichier, debut, fin, nom in plages if frame.filename == fichier and debut <= frame.lineno < fin), None)
+                if adaptateur:
+                    lignes = par_adaptateur.setdefault(adaptateur, Counter())
+                    lignes[f"{frame.filename}:{frame.lineno}"] += trace.size
+                    break
+
+        rapport = [f"Top {self.top} des allocations encore vivantes"]
+        rapport += [str(statistique) for statistique in snapshot.statistics("lineno")[:self.top]]
+        for adaptateur, lignes in sorted(par_adaptateur.items(), key=lambda item: -sum(item[1].values())):
+            rapport += ["", f"{adaptateur} : {sum(lignes.values()) / 1024:.1f} Kio"]
+            rapport += [f"\t{taille / 1024:10.1f} Kio  {ligne}" for ligne, taille in lignes.most_common(self.top)]
+        return "\n".join(rapport) + "\n"
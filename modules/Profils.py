@@ -0,0 +1,96 @@
+import json
+import os
+
+from modules.Annonce import nombre
+from modules.Filtre import mots
+from modules.Flux import FluxNouveautes
+from modules.Fenetre import FenetreNouveautes
+from modules.Geo import commune
+
+
+class Profil:
+    # Une recherche nommée (villes, loyer maximum, surface minimum) avec sa propre
+    # fenêtre de nouveautés et son propre flux pour le tableau de bord.
+    def __init__(self, nom: str, villes: list[str], prix: float, surface: float, dossier: str) -> None:
+        self.nom = nom
+        self.villes = list(villes)
+        self.prix = prix
+        self.surface = surface
+        self.dossier = dossier
+        self.new_file = os.path.join(dossier, "new.json")
+        self.feed_dir = os.path.join(dossier, "feed")
+        # Communes reconnues par leur nom canonique, les autres par leurs mots.
+        self.communes = {commune(ville) or " ".join(mots(ville)) for ville in self.villes}
+        self.fenetre: FenetreNouveautes = None
+        self.flux: FluxNouveautes = None
+
+    def __repr__(self) -> str:
+        return f"Profil({self.nom!r}, {self.villes}, {self.prix}, {self.surface})"
+
+    def charger(self, duree: float) -> "Profil":
+        self.fenetre = FenetreNouveautes.charger(self.new_file, duree)
+        self.flux = FluxNouveautes(self.feed_dir)
+        self.flux.initialiser(self.fenetre.liste())
+        return self
+
+    def budget(self, annonce) -> bool:
+        # Un prix ou une surface inconnus ne font pas écarter l'annonce.
+        prix, surface = nombre(annonce.prix), nombre(annonce.surface)
+        return (prix is None or prix <= self.prix) and (surface is None or surface >= self.surface)
+
+    def situe(self, ville: str) -> bool:
+        nom = commune(ville)
+        if nom:
+            return nom in self.communes
+        texte = " ".join(mots(ville)) if ville else ""
+        return any(texte.startswith(autre) for autre in self.communes)
+
+
+class Profils:
+    # Les sites ne sont interrogés qu'une fois, avec les critères les plus larges de tous
+    # les profils ; les annonces sont ensuite réparties en mémoire entre les profils.
+    def __init__(self, profils: list[Profil]) -> None:
+        if not profils:
+            raise ValueError("au moins un profil de recherche est nécessaire")
+        self.profils = profils
+
+    def __iter__(self):
+        return iter(self.profils)
+
+    def __len__(self) -> int:
+        return len(self.profils)
+
+    @classmethod
+    def charger(cls, fichier: str, dossier: str) -> "Profils":
+        # recherches.json, {"nom": {"villes": [...], "prix": 850, "surface": 20}, ...} : le premier profil garde
+        # database/new.json et database/feed, les suivants ont database/recherches/<nom>/.
+        with open(fichier, encoding="utf-8") as f:
+            configuration = json.load(f)
+        profils = []
+        for rang, (nom, criteres) in enumerate(configuration.items()):
+            sous_dossier = dossier if rang == 0 else os.path.join(dossier, "recherches", "-".join(mots(nom)))
+            profils.append(Profil(nom, criteres["villes"], criteres["prix"], criteres["surface"], sous_dossier))
+        return cls(profils)
+
+    def criteres(self) -> tuple[list[str], float, float]:
+        villes = list(dict.fromkeys(ville for profil in self.profils for ville in profil.villes))
+        return villes, max(profil.prix for profil in self.profils), min(profil.surface for profil in self.profils)
+
+    def charger_fenetres(self, duree: float) -> None:
+        for profil in self.profils:
+            profil.charger(duree)
+
+    def repartir(self, annonces: list, couverture: list[str] = None) -> dict[Profil, list]:
+        # Une annonce va aux profils dont elle respecte le budget et la ville. Si aucun profil
+        # ne reconnaît sa ville (quartier, commune voisine, site qui n'en donne pas), elle va
+        # aux profils qui partagent une ville avec `couverture`, les villes interrogées sur son site :
+        # comme avec un seul profil, seul le budget compte, mais une recherche sur Roubaix ne reçoit
+        # pas les annonces d'un site qui n'interroge que Lille.
+        repartition = {profil: [] for profil in self.profils}
+        voisins = [profil for profil in self.profils if couverture is None or any(map(profil.situe, couverture))]
+        for annonce in annonces:
+            situes = [profil for profil in self.profils if profil.situe(annonce.ville)] or voisins
+            for profil in situes:
+                if profil.budget(annonce):
+                    repartition[profil].append(annonce)
+        return repartition
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import subprocess
+import threading
+
+
+class Publieur:
+    # Les fichiers du tableau de bord ne sont réécrits que si leur contenu change, et les
+    # changements de plusieurs passages sont regroupés dans un seul commit poussé en arrière-plan.
+    def __init__(self, depot: str, message: str = "Mise à jour des nouvelles annonces", regroupement: float = 60.0, push: bool = True) -> None:
+        self.depot = depot
+        self.message = message
+        self.regroupement = regroupement
+        self.push = push
+        self.empreintes: dict[str, str] = {}
+        self.en_attente: set[str] = set()
+        self.condition = threading.Condition()
+        self.verrou_git = threading.Lock()
+        self.arret = threading.Event()
+        self.thread: threading.Thread = None
+        self.commits = 0
+
+    def empreinte(self, donnees: bytes) -> str:
+        return hashlib.sha1(donnees).hexdigest()
+
+    def soumettre(self, fichier: str, donnees: bytes) -> bool:
+        empreinte = self.empreinte(donnees)
+        with self.condition:
+            if fichier not in self.empreintes and os.path.isfile(fichier):
+                with open(fichier, "rb") as f:
+                    self.empreintes[fichier] = self.empreinte(f.read())
+            if self.empreintes.get(fichier) == empreinte:
+                return False
+            os.makedirs(os.path.dirname(fichier), exist_ok=True)
+            tmp = f"{fichier}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(donnees)
+            os.replace(tmp, fichier)
+            self.empreintes[fichier] = empreinte
+            self.en_attente.add(fichier)
+            self.condition.notify()
+        return True
+
+    def retirer(self, fichier: str) -> None:
+        with self.condition:
+            if os.path.isfile(fichier):
+                os.remove(fichier)
+            self.empreintes.pop(fichier, None)
+            self.en_attente.add(fichier)
+            self.condition.notify()
+
+    def demarrer(self) -> "Publieur":
+        self.thread = threading.Thread(target=self.boucle, daemon=True, name="publieur")
+        self.thread.start()
+        return self
+
+    def boucle(self) -> None:
+        while not self.arret.is_set():
+            with self.condition:
+                self.condition.wait_for(lambda: self.en_attente or self.arret.is_set())
+            # Fenêtre de regroupement : les passages suivants rejoignent le même commit.
+            self.arret.wait(self.regroupement)
+            self.vider()
+
+    def vider(self) -> bool:
+        with self.condition:
+            fichiers = sorted(self.en_attente)
+            self.en_attente.clear()
+        if not fichiers:
+            return False
+        with self.verrou_git:
+            return self.publier(fichiers)
+
+    def git(self, *arguments: str) -> subprocess.CompletedProcess:
+        return subprocess.run(["git", *arguments], cwd=self.depot, capture_output=True, text=True)
+
+    def publier(self, fichiers: list[str]) -> bool:
+        chemins = [os.path.relpath(fichier, self.depot) for fichier in fichiers]
+        # Un fichier retiré avant d'avoir jamais été commité n'a plus rien à publier.
+        presents = [chemin for chemin in chemins if os.path.exists(os.path.join(self.depot, chemin))]
+        supprimes = [chemin for chemin in chemins if chemin not in presents and self.git("ls-files", "--", chemin).stdout.strip()]
+        chemins = presents + supprimes
+        if not chemins:
+            return False
+        if presents:
+            self.git("add", "--", *presents)
+        if supprimes:
+            self.git("rm", "--cached", "-q", "--", *supprimes)
+        if self.git("diff", "--cached", "--quiet", "--", *chemins).returncode == 0:
+            return False
+        commit = self.git("commit", "-m", self.message, "--", *chemins)
+        if commit.returncode != 0:
+            print(f"Publication impossible : {commit.stderr.strip() or commit.stdout.strip()}")
+            return False
+        self.commits += 1
+        if self.push:
+            push = self.git("push")
+            if push.returncode != 0:
+                print(f"Push impossible : {push.stderr.strip()}")
+        return True
+
+    def arreter(self) -> None:
+        self.arret.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join()
+        self.vider()
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from operator import itemgetter
+from urllib.parse import parse_qs, urlsplit
+
+from modules.Annonce import nombre
+from modules.Filtre import mots
+from modules.Geo import GrilleGeo, coordonnees, localiser
+from modules.Stockage import timestamp_to_detection
+
+TRIS = ("detection", "prix", "surface")
+
+
+def normaliser(ville: str) -> str:
+    return " ".join(mots(ville)) if ville else None
+
+
+class IndexAnnonces:
+    # Index secondaires en mémoire : tableaux triés (bisect) pour prix, surface et
+    # détection, tables de hachage pour ville et site. Une requête part du critère
+    # le plus sélectif et vérifie les autres sur chaque candidat.
+    def __init__(self) -> None:
+        self.annonces: list[dict] = []
+        self.positions: dict[tuple[str, str], int] = {}
+        self.tries: dict[str, list[tuple[float, int]]] = {tri: [] for tri in TRIS}
+        # Valeurs triables par position, plus rapides à tester qu'un accès au dict de l'annonce.
+        self.colonnes: dict[str, list[float]] = {tri: [] for tri in TRIS}
+        self.villes: dict[str, set[int]] = defaultdict(set)
+        self.sites: dict[str, set[int]] = defaultdict(set)
+        self.geo = GrilleGeo()
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def charger(cls, stockage) -> "IndexAnnonces":
+        index = cls()
+        for row in stockage.parcourir():
+            index.ajouter(row["site"], row["reference"], stockage.annonce(row), row["detection"])
+        return index
+
+    def ajouter(self, site: str, reference: str, annonce: dict, horodatage: float) -> None:
+        cle = (site, str(reference))
+        if cle in self.positions:
+            self.retirer(cle)
+        position = len(self.annonces)
+        annonce = {"site": site, "reference": str(reference), **annonce, "horodatage": horodatage}
+        # L'historique importé de db.json peut contenir des prix non numériques.
+        annonce["prix"], annonce["surface"] = nombre(annonce.get("prix")), nombre(annonce.get("surface"))
+        annonce.setdefault("detection", timestamp_to_detection(horodatage))
+        self.annonces.append(annonce)
+        self.positions[cle] = position
+        for tri in TRIS:
+            valeur = horodatage if tri == "detection" else annonce.get(tri)
+            self.colonnes[tri].append(valeur)
+            if valeur is not None:
+                insort(self.tries[tri], (valeur, position))
+        self.villes[normaliser(annonce.get("ville"))].add(position)
+        self.sites[site].add(position)
+        # Sans coordonnées fournies par le site, on se rabat sur le centre de la commune.
+        point = coordonnees(annonce.get("coordonnees"))
+        annonce["localisation"] = "exacte" if point else None
+        if not point and (point := localiser(annonce.get("ville"))):
+            annonce["localisation"] = "commune"
+        if point:
+            self.geo.ajouter(position, *point)
+
+    def retirer(self, cle: tuple[str, str]) -> None:
+        # La position reste occupée (None) : les autres identifiants ne bougent pas.
+        position = self.positions.pop(cle)
+        annonce = self.annonces[position]
+        for tri in TRIS:
+            valeur = self.colonnes[tri][position]
+            if valeur is not None:
+                liste = self.tries[tri]
+                del liste[bisect_left(liste, (valeur, position))]
+            self.colonnes[tri][position] = None
+        self.villes[normaliser(annonce.get("ville"))].discard(position)
+        self.sites[annonce["site"]].discard(position)
+        self.geo.retirer(position)
+        self.annonces[position] = None
+
+    def plage(self, tri: str, minimum: float, maximum: float) -> list[tuple[float, int]]:
+        liste = self.tries[tri]
+        debut = bisect_left(liste, (minimum, -1)) if minimum is not None else 0
+        fin = bisect_right(liste, (maximum, math.inf)) if maximum is not None else len(liste)
+        return liste[debut:fin]
+
+    def requete(self, prix: tuple = (None, None), surface: tuple = (None, None), villes: list[str] = None, sites: list[str] = None,
+                depuis: float = None, autour: tuple = None, rectangle: tuple = None,
+                tri: str = "-detection", page: int = 1, par_page: int = 50) -> dict:
+        # autour = (lat, lon, km), rectangle = (sud, ouest, nord, est)
+        decroissant = tri.startswith("-")
+        tri = tri.lstrip("-")
+        if tri not in TRIS and not (tri == "distance" and autour):
+            raise ValueError(f"tri inconnu : {tri}" + (" (distance demande lat, lon et rayon_km)" if tri == "distance" else ""))
+
+        # Chaque critère donne sa taille, ses candidats et un test : on parcourt les
+        # candidats du plus sélectif et on applique les tests des autres.
+        criteres = []
+        for nom, (minimum, maximum) in (("prix", prix), ("surface", surface), ("detection", (depuis, None))):
+            if minimum is not None or maximum is not None:
+                plage = self.plage(nom, minimum, maximum)
+                test = lambda position, colonne=self.colonnes[nom], minimum=minimum, maximum=maximum: dans(colonne[position], minimum, maximum)
+                criteres.append((len(plage), lambda plage=plage: set(map(itemgetter(1), plage)), test))
+        for table, valeurs in ((self.villes, [normaliser(ville) for ville in villes or ()]), (self.sites, sites or ())):
+            if valeurs:
+                ensemble = set().union(*(table.get(valeur, ()) for valeur in valeurs))
+                criteres.append((len(ensemble), lambda ensemble=ensemble: ensemble, ensemble.__contains__))
+        # Zones géographiques : la grille donne un majorant sans calculer de distance, qui ne
+        # sont calculées que pour les candidats d'un critère plus sélectif.
+        distance_a = None
+        if autour:
+            lat, lon, km = autour
+            distance_a = self.geo.distances(lat, lon)
+            criteres.append((self.geo.compter(*self.geo.englobant(lat, lon, km)),
+                             lambda: self.geo.rayon(lat, lon, km), lambda position: distance_a(position) <= km))
+        if rectangle:
+            criteres.append((self.geo.compter(*rectangle), lambda: self.geo.rectangle(*rectangle),
+                             lambda position: self.geo.contient(position, *rectangle)))
+
+        ordre = self.tries.get(tri)
+        colonne = self.colonnes.get(tri)
+        debut, fin = (page - 1) * par_page, page * par_page
+        if criteres:
+            criteres.sort(key=lambda critere: critere[0])
+            if criteres[0][0] * 8 < len(self):
+                tests = [test for _, _, test in criteres[1:]]
+                retenus = {position for position in criteres[0][1]() if all(test(position) for test in tests)}
+            else:
+                # Critères peu sélectifs : l'intersection d'ensembles (en C) bat les tests un à un.
+                retenus = set.intersection(*(candidats() for _, candidats, _ in criteres))
+        else:
+            retenus = None
+        total = len(self) if retenus is None else len(retenus)
+
+        if tri == "distance":
+            page_positions = sorted(retenus, key=distance_a, reverse=decroissant)[debut:fin]
+        elif retenus is not None and len(retenus) * 8 < len(self):
+            # Peu de résultats : les trier coûte moins que parcourir tout l'ordre.
+            valorises = sorted((position for position in retenus if colonne[position] is not None),
+                               key=colonne.__getitem__, reverse=decroissant)
+            sans_valeur = [position for position in retenus if colonne[position] is None]
+            page_positions = (valorises + sans_valeur)[debut:fin]
+        else:
+            # Beaucoup de résultats : on suit l'index trié jusqu'à remplir la page.
+            page_positions = []
+            parcours = reversed(ordre) if decroissant else iter(ordre)
+            rang = 0
+            for _, position in parcours:
+                if retenus is not None and position not in retenus:
+                    continue
+                if rang >= debut:
+                    page_positions.append(position)
+                    if len(page_positions) == par_page:
+                        break
+                rang += 1
+            if len(page_positions) < par_page:
+                # Les annonces sans valeur pour le tri passent en dernier.
+                sans_valeur = [position for position in (self.positions.values() if retenus is None else retenus)
+                               if colonne[position] is None]
+                valorises = total - len(sans_valeur)
+                page_positions += sans_valeur[max(debut - valorises, 0):fin - valorises]
+        resultats = [self.annonces[position] for position in page_positions]
+        if distance_a:
+            resultats = [{**annonce, "distance_km": round(distance_a(position), 3)} for annonce, position in zip(resultats, page_positions)]
+        return {"total": total, "page": page, "par_page": par_page, "annonces": resultats}
+
+
+def dans(valeur: float, minimum: float, maximum: float) -> bool:
+    return valeur is not None and (minimum is None or valeur >= minimum) and (maximum is None or valeur <= maximum)
+
+
+class ServeurRecherche:
+    # Petit serveur HTTP/1.1 sur la boucle asyncio du programme : GET /annonces?prix_max=800&ville=Lille&tri=-detection&page=2
+    # Recherche géographique : lat=50.63&lon=3.06&rayon_km=2&tri=distance, ou bbox=sud,ouest,nord,est
+    # Plein texte sur les descriptions : GET /texte?q=balcon "place de parking"&prix_max=800
+    def __init__(self, index: IndexAnnonces, stockage=None, par_page_max: int = 500) -> None:
+        self.index = index
+        self.stockage = stockage
+        self.par_page_max = par_page_max
+        self.serveur: asyncio.AbstractServer = None
+
+    async def demarrer(self, hote: str = "127.0.0.1", port: int = 8765) -> "ServeurRecherche":
+        self.serveur = await asyncio.start_server(self.connexion, hote, port)
+        return self
+
+    @property
+    def port(self) -> int:
+        return self.serveur.sockets[0].getsockname()[1]
+
+    def parametres(self, requete: str) -> dict:
+        query = parse_qs(requete)
+        nombre = lambda nom, defaut=None: float(query[nom][0]) if nom in query else defaut
+        par_page = int(nombre("par_page", 50))
+        page = int(nombre("page", 1))
+        if page < 1 or not 1 <= par_page <= self.par_page_max:
+            raise ValueError(f"page >= 1 et 1 <= par_page <= {self.par_page_max}")
+        autour = rectangle = None
+        if "rayon_km" in query:
+            if "lat" not in query or "lon" not in query:
+                raise ValueError("rayon_km demande lat et lon")
+            autour = (nombre("lat"), nombre("lon"), nombre("rayon_km"))
+        if "bbox" in query:
+            rectangle = tuple(float(valeur) for valeur in query["bbox"][0].split(","))
+            if len(rectangle) != 4:
+                raise ValueError("bbox attend sud,ouest,nord,est")
+        return {
+            "prix": (nombre("prix_min"), nombre("prix_max")),
+            "surface": (nombre("surface_min"), nombre("surface_max")),
+            "villes": query.get("ville"),
+            "sites": query.get("site"),
+            "depuis": nombre("depuis"),
+            "autour": autour,
+            "rectangle": rectangle,
+            "tri": query.get("tri", ["-detection"])[0],
+            "page": page,
+            "par_page": par_page,
+        }
+
+    def repondre(self, chemin: str) -> tuple[int, dict]:
+        url = urlsplit(chemin)
+        if url.path not in ("/annonces", "/texte") or (url.path == "/texte" and not self.stockage):
+            return 404, {"erreur": f"{url.path} introuvable"}
+        try:
+            parametres = self.parametres(url.query)
+        except ValueError as e:
+            return 400, {"erreur": str(e)}
+        if url.path == "/texte":
+            return self.texte(parse_qs(url.query).get("q", [""])[0], parametres)
+        try:
+            return 200, self.index.requete(**parametres)
+        except ValueError as e:
+            return 400, {"erreur": str(e)}
+
+    def texte(self, q: str, parametres: dict) -> tuple[int, dict]:
+        if not q.strip():
+            return 400, {"erreur": "paramètre q requis"}
+        page, par_page = parametres["page"], parametres["par_page"]
+        resultats = self.stockage.rechercher(q, parametres["prix"], parametres["surface"], par_page, (page - 1) * par_page)
+        return 200, {"page": page, "par_page": par_page, "annonces": [{**annonce, "score": round(score, 3)} for score, annonce in resultats]}
+
+    async def connexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                methode, chemin, version = ligne.decode("latin-1").split()
+                entetes = {}
+                while (entete := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    nom, _, valeur = entete.decode("latin-1").partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip()
+                statut, corps = self.repondre(chemin) if methode == "GET" else (405, {"erreur": "GET uniquement"})
+                donnees = json.dumps(corps, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                garder = version == "HTTP/1.1" and entetes.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {statut} {'OK' if statut == 200 else 'Erreur'}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(donnees)}\r\n"
+                             f"Access-Control-Allow-Origin: *\r\n"
+                             f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n".encode("latin-1") + donnees)
+                await writer.drain()
+                if not garder:
+                    break
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def fermer(self) -> None:
+        self.serveur.close()
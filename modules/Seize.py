@@ -0,0 +1,18 @@
+from modules.Catalogue import CATALOGUE_URL, CatalogueAnnonces, Champ, SpecCatalogue
+
+
+class SeizeAnnonces(CatalogueAnnonces):
+    spec = SpecCatalogue(
+        nom="Seize Immo",
+        domaine="https://www.seize-immobilier.com",
+        url="https://www.seize-immobilier.com" + CATALOGUE_URL.format(search_id="1777818247876088"),
+        conteneur=".link-product",
+        champs={
+            "url": Champ("a", "lien", rang=1),
+            "prix": Champ(".product-price", "montant"),
+            "ville": Champ(".product-name", "apres_virgule"),
+            "surface": Champ(".data-list__item--Surface .data-list__item--value", "montant"),
+            "reference": Champ(".data-list__item--products_model .data-list__item--value"),
+        },
+        slugs={"lille": "LILLE", "la madeleine": "59110 LA-MADELEINE"},
+    )
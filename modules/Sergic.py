@@ -0,0 +1,54 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+
+class SergicAnnonces(Annonces):
+    conteneur = ("appt-desc__description-text-paragraph", "appt-desc__carousel-container")
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        return super().__init__("Sergic", villes, prix, surface)
+
+    def query_url(self, ville: str) -> str:
+        return f'https://www.sergic.com/wp-json/sergic/v1/post?params[contract_type]=location&params[place_types][]=appartement&params[dispo]=all&params[localisation_srch]=false&params[professional_announcement]=false&params[expanse_srch]=0&params[appt_min_area]={self.surface}&params[price_min]=0&params[price_max]={self.prix}&params[ref]=&params[isRef]=false&params[zoomed]=&params[citySearch]={ville}&params[place]=&params[lat_move_map]=&params[lng_move_map]=&params[zoom_move_map]=&params[agency_siret]='
+
+    async def aget_raw_response(self) -> dict:
+        response = []
+        api_resps = await asyncio.gather(*(self.aget_api_response(self.query_url(ville)) for ville in self.villes))
+        for ville, api_resp in zip(self.villes, api_resps):
+            if isinstance(api_resp, bool):
+                print(f"La ville {ville} n'a pas de résultats")
+                continue
+            response += api_resp
+        return response
+
+    def filter_raw_response(self, raw_response: dict, old_annonces: dict) -> dict:
+        # Les pages de détail ne sont téléchargées que pour les références inconnues.
+        return [annonce for annonce in raw_response if annonce["ref"] not in old_annonces]
+
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        with ThreadPoolExecutor(max_workers=self.connexions_par_hote) as pool:
+            annonces_html = pool.map(lambda link: self.get_html_response(link, self.conteneur),
+                                     [annonce["link"] for annonce in raw_response])
+        for annonce, annonce_html in zip(raw_response, annonces_html):
+            description = annonce_html.find(
+                "div", {"class": "appt-desc__description-text-paragraph"}).text
+            if self.is_redibitoire(description):
+                continue
+            images = [image["src"] for image in annonce_html.select(
+                ".appt-desc__carousel-container img")]
+            annonce_obj: Annonce = Annonce(
+                reference=annonce["ref"],
+                ville=annonce["city"],
+                prix=annonce["price"],
+                surface=annonce["area"],
+                url=annonce["link"],
+                description=description,
+                images=images,
+                coordonnees=(annonce["lat"], annonce["lng"]),
+                disponibilite=annonce["disponibility"]
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
@@ -0,0 +1,41 @@
+import importlib
+
+# Adaptateurs déclarés par nom de site, un module par site : la classe n'est importée
+# que si le site est activé.
+ADAPTATEURS = {
+    "SERGIC": "modules.Sergic.SergicAnnonces",
+    "FONCIA": "modules.Foncia.FonciaAnnonces",
+    "CITYA": "modules.Citya.CityaAnnonces",
+    "VACHERAND": "modules.Vacherand.VacherandAnnonces",
+    "LEDOUX": "modules.Ledoux.LedouxAnnonces",
+    "LILLE IMMO": "modules.LilleImmo.LilleImmoAnnonces",
+    "ORPI": "modules.Orpi.OrpiAnnonces",
+    "NEXITY": "modules.Nexity.NexityAnnonces",
+    "GLV": "modules.GLV.GLVAnnonces",
+    "CAVROIS": "modules.Cavrois.CavroisAnnonces",
+    "DEFRANCE IMMO": "modules.DefranceImmo.DefranceImmoAnnonces",
+    "SEIZE": "modules.Seize.SeizeAnnonces",
+    "FAELENS": "modules.Faelens.FaelensAnnonces",
+    "C IMMO": "modules.CImmo.CImmoAnnonces",
+    "CHOQUET": "modules.Choquet.ChoquetAnnonces",
+}
+
+
+def nom_site(nom: str) -> str:
+    # "lille-immo", "Lille Immo" ou "LILLE IMMO" désignent le même site.
+    cle = nom.upper().replace("-", " ").replace("_", " ").strip()
+    if cle not in ADAPTATEURS:
+        raise ValueError(f"site inconnu : {nom} (sites : {', '.join(ADAPTATEURS)})")
+    return cle
+
+
+def adaptateur(nom: str) -> type:
+    module, _, classe = ADAPTATEURS[nom_site(nom)].rpartition(".")
+    return getattr(importlib.import_module(module), classe)
+
+
+def selectionner(seulement: list[str] = None, exclus: list[str] = None) -> dict[str, type]:
+    # Tous les sites par défaut, ou seulement ceux demandés, moins les exclus ; dans l'ordre du registre.
+    retenus = {nom_site(nom) for nom in seulement} if seulement else set(ADAPTATEURS)
+    retenus -= {nom_site(nom) for nom in exclus or ()}
+    return {nom: adaptateur(nom) for nom in ADAPTATEURS if nom in retenus}
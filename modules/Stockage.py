@@ -0,0 +1,168 @@
+import datetime
+import json
+import os
+import sqlite3
+import sys
+
+from modules.Annonce import Annonce
+from modules.Doublons import pack
+from modules.Texte import analyser, expression
+
+FORMAT_DETECTION = "%d/%m/%Y %H:%M:%S"
+CHAMPS = ["ville", "prix", "surface", "url", "description", "images", "coordonnees", "disponibilite", "publication"]
+CHAMPS_JSON = ["images", "coordonnees"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS annonces (
+    site TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    ville TEXT,
+    prix NUMERIC,
+    surface NUMERIC,
+    url TEXT,
+    description TEXT,
+    images TEXT,
+    coordonnees TEXT,
+    disponibilite TEXT,
+    publication TEXT,
+    detection REAL,
+    groupe TEXT,
+    signature BLOB,
+    PRIMARY KEY (site, reference)
+);
+CREATE INDEX IF NOT EXISTS annonces_detection ON annonces (detection);
+CREATE INDEX IF NOT EXISTS annonces_site ON annonces (site);
+CREATE INDEX IF NOT EXISTS annonces_ville ON annonces (ville);
+CREATE VIRTUAL TABLE IF NOT EXISTS annonces_texte USING fts5 (termes, tokenize = 'ascii');
+"""
+
+
+def detection_to_timestamp(detection: str) -> float:
+    return datetime.datetime.strptime(detection, FORMAT_DETECTION).timestamp() if detection else None
+
+
+def timestamp_to_detection(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).strftime(FORMAT_DETECTION) if timestamp is not None else None
+
+
+class Stockage:
+    def __init__(self, chemin: str) -> None:
+        self.chemin = chemin
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.row_factory = sqlite3.Row
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.executescript(SCHEMA)
+        self.migrer()
+
+    def migrer(self) -> None:
+        colonnes = {row["name"] for row in self.connexion.execute("PRAGMA table_info(annonces)")}
+        for colonne, type in (("groupe", "TEXT"), ("signature", "BLOB")):
+            if colonne not in colonnes:
+                self.connexion.execute(f"ALTER TABLE annonces ADD COLUMN {colonne} {type}")
+        # Index plein texte : seules les annonces encore absentes (base antérieure) sont analysées.
+        manquantes = self.connexion.execute("SELECT rowid, description FROM annonces WHERE rowid NOT IN (SELECT rowid FROM annonces_texte)").fetchall()
+        if manquantes:
+            with self.connexion:
+                self.connexion.executemany("INSERT INTO annonces_texte (rowid, termes) VALUES (?, ?)",
+                                           [(row["rowid"], " ".join(analyser(row["description"]))) for row in manquantes])
+
+    def close(self) -> None:
+        self.connexion.close()
+
+    def references(self, site: str) -> set[str]:
+        return {row[0] for row in self.connexion.execute("SELECT reference FROM annonces WHERE site = ?", (site,))}
+
+    def ligne(self, site: str, reference: str, annonce: dict) -> tuple:
+        groupe = signature = None
+        if isinstance(annonce, Annonce):
+            groupe, signature = annonce.groupe, pack(annonce.signature) if annonce.signature else None
+            annonce = {**annonce.valeurs(), "horodatage": annonce.horodatage}
+        valeurs = [json.dumps(annonce.get(champ)) if champ in CHAMPS_JSON else annonce.get(champ) for champ in CHAMPS]
+        detection = annonce.get("horodatage")
+        if detection is None and annonce.get("detection"):
+            detection = detection_to_timestamp(annonce["detection"])
+        return (site, str(reference), *valeurs, detection, groupe, signature)
+
+    def ajouter(self, nouveautes: dict[str, dict[str, Annonce]]) -> int:
+        # Une seule transaction par boucle, limitée aux nouvelles lignes.
+        lignes = [self.ligne(site, reference, annonce) for site, annonces in nouveautes.items() for reference, annonce in annonces.items()]
+        colonnes = ", ".join(["site", "reference", *CHAMPS, "detection", "groupe", "signature"])
+        mises_a_jour = ", ".join(f"{champ} = excluded.{champ}" for champ in CHAMPS)
+        with self.connexion:
+            self.connexion.executemany(
+                f"INSERT INTO annonces ({colonnes}) VALUES ({', '.join('?' * (len(CHAMPS) + 5))}) "
+                f"ON CONFLICT (site, reference) DO UPDATE SET {mises_a_jour}", lignes)
+            # La description est déjà analysée ici : l'index FTS5 ne stocke que les racines.
+            description = 2 + CHAMPS.index("description")
+            self.connexion.executemany(
+                "INSERT OR REPLACE INTO annonces_texte (rowid, termes) SELECT rowid, ? FROM annonces WHERE site = ? AND reference = ?",
+                [(" ".join(analyser(ligne[description])), ligne[0], ligne[1]) for ligne in lignes])
+        return len(lignes)
+
+    def annonce(self, row: sqlite3.Row) -> dict:
+        annonce = {champ: json.loads(row[champ]) if champ in CHAMPS_JSON and row[champ] is not None else row[champ] for champ in CHAMPS}
+        if row["detection"] is not None:
+            annonce["detection"] = timestamp_to_detection(row["detection"])
+        return annonce
+
+    def rechercher(self, requete: str, prix: tuple = (None, None), surface: tuple = (None, None), limite: int = 50, decalage: int = 0) -> list[tuple[float, dict]]:
+        # Mots et "phrases" entre guillemets, tous requis, classés par BM25 (plus pertinent d'abord).
+        correspondance = expression(requete)
+        if not correspondance:
+            return []
+        conditions, parametres = ["annonces_texte MATCH ?"], [correspondance]
+        for champ, (minimum, maximum) in (("prix", prix), ("surface", surface)):
+            if minimum is not None:
+                conditions.append(f"a.{champ} >= ?")
+                parametres.append(minimum)
+            if maximum is not None:
+                conditions.append(f"a.{champ} <= ?")
+                parametres.append(maximum)
+        rows = self.connexion.execute(
+            f"SELECT a.*, -bm25(annonces_texte) AS score FROM annonces_texte JOIN annonces a ON a.rowid = annonces_texte.rowid "
+            f"WHERE {' AND '.join(conditions)} ORDER BY bm25(annonces_texte) LIMIT ? OFFSET ?", (*parametres, limite, decalage))
+        return [(row["score"], {"site": row["site"], "reference": row["reference"], **self.annonce(row)}) for row in rows]
+
+    def recentes(self, depuis: float) -> list[tuple[float, dict]]:
+        rows = self.connexion.execute("SELECT * FROM annonces WHERE detection >= ? ORDER BY detection", (depuis,))
+        return [(row["detection"], self.annonce(row)) for row in rows]
+
+    def parcourir(self) -> sqlite3.Cursor:
+        return self.connexion.execute("SELECT * FROM annonces ORDER BY detection")
+
+    def dedoublonnage(self) -> sqlite3.Cursor:
+        return self.connexion.execute("SELECT site, reference, ville, prix, surface, description, groupe, signature, detection FROM annonces ORDER BY detection")
+
+    def maj_dedoublonnage(self, signatures: list[tuple[bytes, str, str, str]]) -> None:
+        with self.connexion:
+            self.connexion.executemany("UPDATE annonces SET signature = ?, groupe = ? WHERE site = ? AND reference = ?", signatures)
+
+    def importer_json(self, db_file: str) -> int:
+        return self.ajouter(json.load(open(db_file)))
+
+    def exporter_json(self, db_file: str) -> None:
+        db = {}
+        for row in self.connexion.execute("SELECT * FROM annonces ORDER BY site, rowid"):
+            db.setdefault(row["site"], {})[row["reference"]] = self.annonce(row)
+        json.dump(db, open(db_file, "w"), indent=4)
+
+
+def ouvrir(chemin: str, db_file: str = None) -> Stockage:
+    # Au premier lancement, l'historique db.json est importé dans la base SQLite.
+    nouvelle = not os.path.isfile(chemin)
+    stockage = Stockage(chemin)
+    if nouvelle and db_file and os.path.isfile(db_file):
+        print(f'Import de {stockage.importer_json(db_file)} annonces depuis {db_file}')
+    return stockage
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print("Usage : python -m modules.Stockage import|export base.sqlite db.json")
+        sys.exit(1)
+    commande, chemin, db_file = sys.argv[1:]
+    stockage = Stockage(chemin)
+    if commande == "import":
+        print(f'{stockage.importer_json(db_file)} annonces importées')
+    else:
+        stockage.exporter_json(db_file)
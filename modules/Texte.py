@@ -0,0 +1,59 @@
+import re
+import sys
+
+from modules.Filtre import mots
+
+# Élisions retirées avant le repli des accents, qui supprimerait l'apostrophe typographique
+# et collerait l'article au mot ("l’entrée" -> "lentree").
+ELISION = re.compile(r"\b(?:[cdjlmnst]|qu|jusqu|lorsqu|puisqu)['’]", re.IGNORECASE)
+PHRASE = re.compile(r'"([^"]*)"|(\S+)')
+MOTS_VIDES = {
+    "a", "au", "aux", "avec", "ce", "ces", "cet", "cette", "dans", "de", "des", "du", "en", "est", "et",
+    "il", "la", "le", "les", "leur", "ou", "par", "pour", "sa", "se", "ses", "son", "sur", "un", "une", "vous",
+}
+
+
+def raciner(mot: str) -> str:
+    # Racinisation légère : pluriels et féminins seulement ("meublées", "meublé" -> "meubl",
+    # "locaux" -> "local"), assez pour rapprocher les formes d'une annonce à l'autre.
+    if len(mot) <= 3 or mot.isdigit():
+        return mot
+    if mot.endswith("aux") and len(mot) > 4:
+        return mot[:-3] + "al"
+    if mot[-1] in "sx":
+        mot = mot[:-1]
+    if mot.endswith("er") and len(mot) > 4:
+        mot = mot[:-1]
+    while mot.endswith("e") and len(mot) > 3:
+        mot = mot[:-1]
+    if len(mot) > 3 and mot[-1] == mot[-2] and mot[-1] not in "aeiou":
+        mot = mot[:-1]
+    return mot
+
+
+def analyser(texte: str) -> list[str]:
+    if not texte:
+        return []
+    return [raciner(mot) for mot in mots(ELISION.sub(" ", texte)) if mot not in MOTS_VIDES]
+
+
+def expression(requete: str) -> str:
+    # 'balcon "place de parking" meublé' -> '"balcon" AND "plac parking" AND "meubl"' pour FTS5 :
+    # chaque terme passe par la même analyse que les descriptions, les guillemets gardent les phrases.
+    termes = []
+    for phrase, mot in PHRASE.findall(requete or ""):
+        racines = analyser(phrase or mot)
+        if racines:
+            termes.append(f'"{" ".join(racines)}"')
+    return " AND ".join(termes)
+
+
+if __name__ == "__main__":
+    from modules.Stockage import Stockage
+    if len(sys.argv) < 3:
+        print('Usage : python -m modules.Texte base.sqlite "balcon parking" [prix_max] [surface_min]')
+        sys.exit(1)
+    prix_max = float(sys.argv[3]) if len(sys.argv) > 3 else None
+    surface_min = float(sys.argv[4]) if len(sys.argv) > 4 else None
+    for score, annonce in Stockage(sys.argv[1]).rechercher(sys.argv[2], prix=(None, prix_max), surface=(surface_min, None)):
+        print(f'{score:6.2f}  {annonce["site"]:<14}{annonce["prix"] or "":>6} €{annonce["surface"] or "":>6} m²  {annonce["url"]}')
@@ -0,0 +1,141 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from modules.Limiteur import SeauJetons
+
+try:
+    import brotli
+    ENCODAGES = "gzip, deflate, br"
+except ImportError:
+    ENCODAGES = "gzip, deflate"
+
+
+class Transport:
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/113.0",
+        "Accept-Encoding": ENCODAGES,
+    }
+
+    # Débit par défaut par hôte (requêtes/s, rafale) ; `debits` le règle hôte par hôte, None le désactive.
+    def __init__(self, tentatives: int = 2, backoff: float = 0.5, connexions: int = 8, timeout: float = 30,
+                 debit: float = 4.0, rafale: int = 8) -> None:
+        self.tentatives = tentatives
+        self.backoff = backoff
+        self.connexions = connexions
+        self.timeout = timeout
+        self.sessions: dict[str, requests.Session] = {}
+        self.debit = debit
+        self.rafale = rafale
+        self.debits: dict[str, tuple[float, int]] = {}
+        self.seaux: dict[str, SeauJetons] = {}
+        self.verrou = threading.Lock()
+        self.redirection: str = None
+        self.observateurs: list = []
+
+    def session(self, url: str) -> requests.Session:
+        hote = urlsplit(url).netloc
+        with self.verrou:
+            if hote not in self.sessions:
+                # Les 429 ne sont pas rejoués ici mais dans request(), pour repasser par le seau de l'hôte.
+                retries = Retry(total=self.tentatives, backoff_factor=self.backoff,
+                                status_forcelist=(500, 502, 503, 504), allowed_methods=None,
+                                respect_retry_after_header=False)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.connexions, max_retries=retries)
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[hote] = session
+            return self.sessions[hote]
+
+    def seau(self, url: str) -> SeauJetons:
+        hote = urlsplit(url).netloc
+        with self.verrou:
+            if hote not in self.seaux:
+                debit, rafale = self.debits.get(hote, (self.debit, self.rafale))
+                self.seaux[hote] = SeauJetons(debit, rafale) if debit else None
+            return self.seaux[hote]
+
+    def rediriger(self, url: str) -> str:
+        # Rejoue les requêtes vers un serveur local : https://hote/chemin -> {redirection}/hote/chemin
+        if not self.redirection:
+            return url
+        morceaux = urlsplit(url)
+        query = f"?{morceaux.query}" if morceaux.query else ""
+        return f"{self.redirection}/{morceaux.netloc}{morceaux.path}{query}"
+
+    def attente(self, response: requests.Response, tentative: int) -> float:
+        # Retry-After en secondes s'il est fourni, sinon le même backoff exponentiel que urllib3.
+        retry_after = response.headers.get("Retry-After", "")
+        return float(retry_after) if retry_after.isdigit() else self.backoff * 2 ** tentative
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        # Toutes les requêtes vers un hôte (pages, détails d'annonces, depuis n'importe quel
+        # thread, nouvelles tentatives après un 429) passent par son seau : pas de rafale
+        # capable de nous faire bannir. Le seau est None pour un hôte sans limite de débit.
+        seau = self.seau(url)
+        cible = self.rediriger(url)
+        for tentative in range(self.tentatives + 1):
+            if seau:
+                seau.prendre()
+            try:
+                response = self.session(cible).request(method, cible, **kwargs)
+            except requests.exceptions.RetryError:
+                # 5xx encore présents après les nouvelles tentatives.
+                if seau:
+                    seau.ralentir()
+                raise
+            if response.status_code != 429:
+                break
+            if seau:
+                seau.ralentir()
+            if tentative < self.tentatives:
+                time.sleep(self.attente(response, tentative))
+        else:
+            # 429 à chaque tentative : le site est en échec pour ce passage.
+            response.raise_for_status()
+        if seau:
+            seau.accelerer()
+        for observateur in self.observateurs:
+            observateur(response)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        # Compteurs des pools urllib3 : une requête sans nouvelle connexion est une réutilisation.
+        stats = {}
+        with self.verrou:
+            sessions = dict(self.sessions)
+        for hote, session in sessions.items():
+            connexions = requetes = 0
+            for adapter in set(session.adapters.values()):
+                for key in adapter.poolmanager.pools.keys():
+                    pool = adapter.poolmanager.pools.get(key)
+                    if pool is None:
+                        continue
+                    connexions += pool.num_connections
+                    requetes += pool.num_requests
+            stats[hote] = {
+                "connexions": connexions,
+                "requetes": requetes,
+                "reutilisations": requetes - connexions,
+            }
+        return stats
+
+    def close(self) -> None:
+        with self.verrou:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+
+transport = Transport()
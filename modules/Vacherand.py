@@ -0,0 +1,75 @@
+from modules.Annonce import Annonce
+from modules.Annonces import Annonces
+import asyncio
+import math
+
+
+class VacherandAnnonces(Annonces):
+    slugs = {
+        'lille': 6,
+        'la madeleine': 19
+    }
+
+    def __init__(self, villes: list[str], prix: int, surface: int) -> None:
+        super().__init__('Vacherand', villes, prix, surface)
+
+    def query_url(self, page) -> str:
+        return f'https://www.vacherand.fr/achat-location-biens-immobiliers-page-{page}'
+
+    def request_body(self) -> dict:
+        return {
+            "rech": "ok", 
+            "transaction": "location", 
+            "id_type[]": 2, 
+            "prix_max": self.prix, 
+            "id_ville[]": self.get_slugs_villes(), 
+            "surface_min": self.surface}
+
+    selecteur_annonces = ".liste_biens article"
+    conteneur = ("liste_biens",)
+    per_page = 8
+
+    def analyser_page(self, html: str) -> tuple[int, list]:
+        # Ici le nombre renvoyé est le total annoncé en tête de page, pas celui de la page.
+        soup = self.html_to_soup(html, self.conteneur + ("ti30",))
+        nb = int(soup.find("h1", class_="ti30").text.split(" ")[0])
+        return nb, soup.select(self.selecteur_annonces)
+
+    async def aget_page(self, page: int) -> tuple[int, dict]:
+        return await self.aget_page_response(self.query_url(page), "POST", data=self.request_body())
+
+    async def aiter_pages(self, old_annonces: dict):
+        nb, annonces = await self.aget_page(1)
+        yield annonces
+        last_page = math.ceil(nb / self.per_page)
+        for page in asyncio.as_completed([self.aget_page(page) for page in range(2, last_page + 1)]):
+            _, annonces = await page
+            yield annonces
+
+    async def aget_raw_response(self) -> dict:
+        return await self.acollecter(self.aiter_pages({}))
+    
+    def format_raw_response(self, raw_response: dict) -> dict:
+        formatted_response = {}
+        for annonce in raw_response:
+            description = annonce.find("div", class_="description").text
+            if self.is_redibitoire(description):
+                continue
+            url = annonce.select_one("a.detail").get("href")
+            ref = url.split("/ref-")[-1]
+            prix = annonce.find("span", class_="prix").text.split(" ")[0]
+            ti18 = annonce.find("h3", class_="ti18").text
+            surface = ti18.split("m²")[0].split(" ")[-1]
+            ville = ti18.split("m²")[1].strip()
+            images = [image.get("src") for image in annonce.select(".bien img")]
+            annonce_obj: Annonce = Annonce(
+                reference=ref,
+                ville=ville,
+                prix=prix,
+                surface=surface,
+                url=f'https://www.vacherand.fr/{url}',
+                description=description,
+                images=images,
+            )
+            formatted_response[annonce_obj.reference] = annonce_obj
+        return formatted_response
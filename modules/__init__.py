@@ -1 +1,12 @@
-from .Annonces import *
\ No newline at end of file
+import importlib
+
+
+def __getattr__(nom: str):
+    # Les adaptateurs ne sont chargés qu'au premier accès (from modules import SergicAnnonces) :
+    # importer modules.Stockage ou modules.Geo ne coûte plus requests, et un site n'importe que le sien.
+    from modules.Sites import ADAPTATEURS
+    for chemin in ADAPTATEURS.values():
+        module, _, classe = chemin.rpartition(".")
+        if classe == nom:
+            return getattr(importlib.import_module(module), nom)
+    raise AttributeError(f"module 'modules' has no attribute {nom!r}")
@@ -1,7 +1,7 @@
 import requests
 from bs4 import BeautifulSoup
 
-from modules.Annonces import *
+from modules.Vacherand import VacherandAnnonces
 
 # url = "https://www.vacherand.fr/achat-location-biens-immobiliers-page-10"
 